@@ -1,11 +1,11 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from .config import settings
-from .routes import call_routes, twilio_routes, websocket_routes
-from .logging_config import setup_logging
+def create_app():
+    # Imported here so that importing the package (as PDF ingestion workers do) stays light
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.staticfiles import StaticFiles
+    from .routes import call_routes, twilio_routes, websocket_routes
+    from .logging_config import setup_logging
 
-def create_app() -> FastAPI:
     app = FastAPI()
     
     # Setup CORS
@@ -19,6 +19,61 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET")
     GOOGLE_REDIRECT_URI: str = os.getenv("GOOGLE_REDIRECT_URI")
     GOOGLE_REFRESH_TOKEN: str = os.getenv("GOOGLE_REFRESH_TOKEN")
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", 32))
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", 15.0))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", 1))
+    VOICE_MODE: str = os.getenv("VOICE_MODE", "gather")  # gather | stream (bidirectional media stream)
+    LLM_STREAMING: bool = os.getenv("LLM_STREAMING", "true").lower() == "true"
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", 3500))  # Whole prompt, excluding the reply
+    PROMPT_HISTORY_TOKENS: int = int(os.getenv("PROMPT_HISTORY_TOKENS", 800))  # Fold older turns beyond this
+    PROMPT_KEEP_MESSAGES: int = int(os.getenv("PROMPT_KEEP_MESSAGES", 6))  # Recent messages never folded
+    INTENT_SIMILARITY_THRESHOLD: float = float(os.getenv("INTENT_SIMILARITY_THRESHOLD", 0.6))
+    FIRST_TURN_FAST_PATH: bool = os.getenv("FIRST_TURN_FAST_PATH", "true").lower() == "true"
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_THRESHOLD: float = float(os.getenv("RESPONSE_CACHE_THRESHOLD", 0.92))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 86400))
+    RESPONSE_CACHE_MAX_ITEMS: int = int(os.getenv("RESPONSE_CACHE_MAX_ITEMS", 1000))
+    USAGE_MAX_CALLS: int = int(os.getenv("USAGE_MAX_CALLS", 1000))  # Calls whose per-request LLM usage is kept
+    WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "base")
+    ASR_WORKERS: int = int(os.getenv("ASR_WORKERS", 2))
+    ASR_THREADS_PER_WORKER: int = int(os.getenv("ASR_THREADS_PER_WORKER", 2))
+    TTS_ENABLED: bool = os.getenv("TTS_ENABLED", "true").lower() == "true"
+    TTS_VOICE_ID: str = os.getenv("TTS_VOICE_ID", "emily")
+    TTS_SPEED: float = float(os.getenv("TTS_SPEED", 1.0))
+    TTS_SAMPLE_RATE: int = int(os.getenv("TTS_SAMPLE_RATE", 8000))
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "static/tts_cache")
+    TTS_CACHE_URL_PATH: str = os.getenv("TTS_CACHE_URL_PATH", "/static/tts_cache")
+    TTS_MEMORY_CACHE_SIZE: int = int(os.getenv("TTS_MEMORY_CACHE_SIZE", 256))
+    TTS_LOOKAHEAD: int = int(os.getenv("TTS_LOOKAHEAD", 2))  # Sentences synthesized ahead of playback
+    VAD_THRESHOLD_RATIO: float = float(os.getenv("VAD_THRESHOLD_RATIO", 3.0))
+    VAD_MIN_SILENCE_MS: int = int(os.getenv("VAD_MIN_SILENCE_MS", 400))
+    VAD_MAX_SILENCE_MS: int = int(os.getenv("VAD_MAX_SILENCE_MS", 900))
+    VAD_MAX_UTTERANCE_MS: int = int(os.getenv("VAD_MAX_UTTERANCE_MS", 15000))
+    VAD_PARTIAL_INTERVAL_MS: int = int(os.getenv("VAD_PARTIAL_INTERVAL_MS", 1000))
+    VAD_BARGE_IN_MS: int = int(os.getenv("VAD_BARGE_IN_MS", 250))  # Voiced speech needed to cut the agent off
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", "data/embeddings")
+    EMBEDDING_CACHE_MAX_SHARDS: int = int(os.getenv("EMBEDDING_CACHE_MAX_SHARDS", 16))  # Merged into one beyond this
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 64))
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", 5))
+    KNOWLEDGE_MANIFEST_PATH: str = os.getenv("KNOWLEDGE_MANIFEST_PATH", "data/knowledge/manifest.json")
+    VECTOR_SEARCH_MODE: str = os.getenv("VECTOR_SEARCH_MODE", "auto")  # auto | exact | ann
+    ANN_MIN_VECTORS: int = int(os.getenv("ANN_MIN_VECTORS", 20000))
+    ANN_PROBES: int = int(os.getenv("ANN_PROBES", 8))
+    KNOWLEDGE_TAIL_MAX: int = int(os.getenv("KNOWLEDGE_TAIL_MAX", 2000))
+    KNOWLEDGE_TOMBSTONE_RATIO: float = float(os.getenv("KNOWLEDGE_TOMBSTONE_RATIO", 0.2))
+    KNOWLEDGE_COMPACT_INTERVAL: int = int(os.getenv("KNOWLEDGE_COMPACT_INTERVAL", 300))
+    PDF_INGEST_WORKERS: int = int(os.getenv("PDF_INGEST_WORKERS", 4))
+    PDF_PAGE_WINDOW: int = int(os.getenv("PDF_PAGE_WINDOW", 8))
+    INGEST_ENCODE_BATCH: int = int(os.getenv("INGEST_ENCODE_BATCH", 256))
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite | redis
+    SESSION_REDIS_URL: str = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+    SESSION_TTL_SECONDS: float = float(os.getenv("SESSION_TTL_SECONDS", 3600))
+    SESSION_MAX_SIZE: int = int(os.getenv("SESSION_MAX_SIZE", 1000))
+    SESSION_DB_DIR: str = os.getenv("SESSION_DB_DIR", "data/sessions")
     SCOPES: ClassVar[list] = ['https://www.googleapis.com/auth/calendar']
 
     class Config:
@@ -1,6 +1,4 @@
 from . import create_app
-from sentence_transformers import SentenceTransformer
-from openai import OpenAI
 from .config import settings
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks, Depends, HTTPException
 from fastapi.responses import HTMLResponse
@@ -8,10 +6,21 @@ from fastapi.staticfiles import StaticFiles
 from fastapi import Request
 import logging
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes.twilio_routes import router as twilio_router
+from app.routes.twilio_routes import router as twilio_router, evict_idle_sessions
+from app.routes.websocket_routes import router as websocket_router
 import asyncio
-from app.services.ai_agent import AI_SalesAgent
+from app.services.client_registry import client_registry
+from app.services.knowledge_index import knowledge_index
+from app.services.embedding_cache import embedding_cache
 from app.routes.google_auth import router as google_auth_router
+from app.routes.metrics_routes import router as metrics_router
+from app.routes.health_routes import router as health_router
+from app.services.readiness import readiness
+from app.services.pdf_ingestion import pdf_ingestion
+from app.services.asr_pool import asr_pool
+from app.services.tts import tts_cache
+from app.services.intent_engine import intent_engine
+from app.utils.constants import STOCK_PHRASES
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -27,33 +36,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-sentence_transformer_model = None
-openai_client = None
-
 app.include_router(twilio_router)
+app.include_router(websocket_router)
 app.include_router(google_auth_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 
-ai_sales_agent = AI_SalesAgent()
+async def session_sweeper():
+    while True:
+        await asyncio.sleep(60)
+        try:
+            evicted = evict_idle_sessions()
+            if evicted:
+                logger.info(f"Evicted {evicted} idle sessions")
+        except Exception as e:
+            logger.error(f"Error evicting idle sessions: {str(e)}")
 
-def load_sentence_transformer():
-    global sentence_transformer_model
-    try:
-        sentence_transformer_model = SentenceTransformer('all-MiniLM-L6-v2')
-    except Exception as e:
-        pass
+async def knowledge_compactor():
+    while True:
+        await asyncio.sleep(settings.KNOWLEDGE_COMPACT_INTERVAL)
+        try:
+            if knowledge_index.needs_compaction():
+                await asyncio.get_running_loop().run_in_executor(None, knowledge_index.compact)
+        except Exception as e:
+            logger.error(f"Error compacting knowledge: {str(e)}")
+
+def restore_knowledge():
+    # Served from the on-disk embedding cache, so nothing is re-encoded on restart
+    if knowledge_index.restore(lambda chunks: embedding_cache.get_or_encode(chunks, client_registry.encoder.encode)):
+        logger.info(f"Restored knowledge version {knowledge_index.version}")
+
+async def warm_openai():
+    if client_registry.claim_openai_warmup():
+        await client_registry.llm.warmup()
+
+async def prerender_tts():
+    await tts_cache.prerender(STOCK_PHRASES)
+
+# Heavy components load in parallel in the background; /readyz reports progress
+readiness.register("encoder", lambda: client_registry.encoder)
+readiness.register("openai", warm_openai, required=False)
+readiness.register("knowledge", restore_knowledge, required=False)
+readiness.register("whisper", asr_pool.warmup, required=False)
+readiness.register("intents", intent_engine.warmup, required=False)
+readiness.register("salesforce", lambda: client_registry.salesforce_integration, required=False)
+readiness.register("google_calendar", lambda: client_registry.calendar_manager, required=False)
+if settings.TTS_ENABLED:
+    readiness.register("tts", prerender_tts, required=False)
 
 @app.on_event("startup")
 async def startup_event():
-    global openai_client
-    try:
-        load_sentence_transformer()
-        openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    except Exception as e:
-        pass
+    asyncio.create_task(session_sweeper())
+    asyncio.create_task(knowledge_compactor())
+    asyncio.create_task(readiness.load_all())
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    pass
+    await client_registry.aclose()
+    pdf_ingestion.shutdown()
+    asr_pool.shutdown()
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -2,10 +2,9 @@ from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from ..services.ai_agent import AI_SalesAgent
 from ..config import settings
-from twilio.rest import Client
+from ..services.client_registry import client_registry
 
 router = APIRouter()
-twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
 
 @router.post("/make_call")
 async def make_outbound_call(request: Request):
@@ -22,7 +21,7 @@ async def make_outbound_call(request: Request):
         if not phone_number.startswith('+'):
             phone_number = '+' + phone_number
         
-        call = twilio_client.calls.create(
+        call = client_registry.twilio_client.calls.create(
             to=phone_number,
             from_=settings.TWILIO_FROM_NUMBER,
             url=f"{settings.NGROK_URL}/twilio/voice",
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..services.readiness import readiness
+
+router = APIRouter()
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving requests, whatever its components are doing."""
+    return {"status": "ok", **readiness.report()}
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: 200 once every required component has loaded, 503 until then."""
+    report = readiness.report()
+    return JSONResponse(content=report, status_code=200 if report["ready"] else 503)
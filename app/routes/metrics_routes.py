@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..services.embedding_service import query_embedder
+from ..services.asr_pool import asr_pool
+from ..services.tts import tts_cache
+from ..services.usage_meter import usage_meter
+from ..services.intent_engine import intent_engine
+from ..services.response_cache import response_cache
+
+router = APIRouter()
+
+@router.get("/metrics/embeddings")
+async def embedding_metrics():
+    """Batch size and queue time of the cross-call query embedding batcher."""
+    return query_embedder.metrics()
+
+@router.get("/metrics/asr")
+async def asr_metrics():
+    """Queue depth and per-job latency of the Whisper worker pool."""
+    return asr_pool.metrics()
+
+@router.get("/metrics/tts")
+async def tts_metrics():
+    """Hit rate of the synthesized speech cache."""
+    return tts_cache.metrics()
+
+@router.get("/metrics/intents")
+async def intent_metrics():
+    """Turns answered by the local intent engine instead of an LLM request."""
+    return intent_engine.metrics()
+
+@router.get("/metrics/response_cache")
+async def response_cache_metrics():
+    """Hit rate and LLM latency saved by the semantic response cache."""
+    return response_cache.metrics()
+
+@router.get("/metrics/usage")
+async def usage_metrics():
+    """OpenAI tokens, latency and estimated spend, overall and per model, purpose, campaign and call."""
+    return usage_meter.metrics()
+
+@router.get("/metrics/usage/calls/{call_sid}")
+async def call_usage_metrics(call_sid: str):
+    """Every OpenAI request made for one call, with its totals."""
+    usage = usage_meter.call_usage(call_sid)
+    if usage is None:
+        return JSONResponse({"status": "error", "message": "No usage recorded for this call"}, status_code=404)
+    return usage
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Request, File, UploadFile, HTTPException
+from fastapi import APIRouter, Request, File, Form, UploadFile, HTTPException
 from fastapi.responses import Response, JSONResponse
-from twilio.twiml.voice_response import VoiceResponse, Gather
+from twilio.twiml.voice_response import VoiceResponse, Gather, Connect
 from ..services.ai_agent import AI_SalesAgent, ai_agents
-from ..services.pdf_processor import PDFProcessor
-from twilio.rest import Client
+from ..services.pdf_ingestion import pdf_ingestion, NO_TEXT_ERROR
+from ..services.client_registry import client_registry
+from ..services.knowledge_index import knowledge_index
+from ..services.session_store import create_session_store
 from ..config import settings  # Ensure you have a config file to load environment variables
 import logging  # Import logging
 from pydantic import BaseModel
 import asyncio
-from ..utils.constants import OUTBOUND_GREETING_TEMPLATE
+from ..services.tts import tts_cache
+from ..services.usage_meter import usage_meter, call_campaigns
+from ..utils.constants import OUTBOUND_GREETING_TEMPLATE, CALL_ERROR_REPLY
 
 server_URL = settings.NGROK_URL  # Ensure you have a config file to load environment variables
 
@@ -25,7 +29,52 @@ logging.getLogger('httpx').setLevel(logging.WARNING)
 
 router = APIRouter()
 
-caller_names = {}
+caller_names = create_session_store("caller_names")
+call_summaries = create_session_store("call_summaries")
+streamed_replies = create_session_store("streamed_replies")  # Rest of a streamed reply, for any worker
+pending_responses = {}  # CallSid -> (agent, task collecting the rest of a streamed reply) on this worker
+
+def cleanup_call(call_sid: str, agent):
+    """End-of-call hook: drop every per-call entry kept alongside the agent."""
+    caller_names.pop(call_sid, None)
+    streamed_replies.pop(call_sid, None)
+    call_campaigns.pop(call_sid, None)
+    pending = pending_responses.pop(call_sid, None)
+    if pending and not pending[1].done():
+        pending[1].cancel()
+
+ai_agents.add_end_hook(cleanup_call)
+
+def evict_idle_sessions() -> int:
+    """Drop sessions whose calls went idle without a call_ends callback."""
+    return sum(store.evict_expired() for store in (ai_agents, caller_names, call_summaries, streamed_replies, call_campaigns))
+
+def save_agent(call_sid: str, agent: AI_SalesAgent):
+    """Write the agent back to the session store, again once background entity parsing or compaction lands."""
+    ai_agents[call_sid] = agent
+    for task in (agent.pending_entities_task, agent.compaction_task):
+        if task and not task.done():
+            task.add_done_callback(lambda _: ai_agents.__setitem__(call_sid, agent))
+
+def outbound_greeting(user_name: str = "") -> str:
+    return OUTBOUND_GREETING_TEMPLATE.format(user_name_part=user_name or "")
+
+def speak(verb, text: str, volume: str = None):
+    """Play the phrase's pre-rendered audio when it is cached, otherwise fall back to <Say>."""
+    speak_reply(verb, [text], volume)
+
+def speak_reply(verb, segments: list[str], volume: str = None, tts: bool = True):
+    """Speak a reply in one voice: rendered audio only if every segment is cached, otherwise <Say>."""
+    urls = [tts_cache.cached_url(segment) for segment in segments] if settings.TTS_ENABLED and tts else []
+    if urls and all(urls):
+        for url in urls:
+            verb.play(url)
+        return
+    for segment in segments:
+        if volume:
+            verb.say(f'<speak><prosody rate="100%" pitch="+2st" volume="{volume}">{segment}</prosody></speak>', ssml=True)
+        else:
+            verb.say(segment)
 
 class SummaryResponse(BaseModel):
     summary: str
@@ -38,6 +87,9 @@ async def handle_incoming_call(request: Request):
         form_data = await request.form()
         call_sid = form_data.get('CallSid')
         user_name = caller_names.get(call_sid, '')
+        # Build the agent while the greeting plays, not on the caller's first reply
+        if call_sid and ai_agents.get(call_sid) is None:
+            ai_agents[call_sid] = AI_SalesAgent()
         
         response = VoiceResponse()
         gather = Gather(
@@ -49,38 +101,64 @@ async def handle_incoming_call(request: Request):
             timeout=5
         )
         # Include the user's name in the greeting if available
-        greeting = OUTBOUND_GREETING_TEMPLATE.format(user_name_part=user_name) if user_name else OUTBOUND_GREETING_TEMPLATE.format(user_name_part="")
-        gather.say(f'<speak><prosody rate="100%" pitch="+2st" volume="soft">{greeting}</prosody></speak>', ssml=True)
+        speak(gather, outbound_greeting(user_name), volume="soft")
         response.append(gather)
         return Response(content=str(response), media_type='text/xml')
     except Exception as e:
         logger.error(f"Error in handle_incoming_call: {str(e)}")
         # Provide a fallback response in case of error
         response = VoiceResponse()
-        response.say(f"{OUTBOUND_GREETING_TEMPLATE}")
+        speak(response, outbound_greeting())
         return Response(content=str(response), media_type='text/xml')
 
 
+@router.post("/twilio/voice/stream")
+async def handle_incoming_call_stream(request: Request):
+    """Answer with a bidirectional media stream instead of the <Gather> webhook loop."""
+    form_data = await request.form()
+    call_sid = form_data.get('CallSid', '')
+    stream_url = settings.NGROK_URL.replace("https://", "wss://").replace("http://", "ws://")
+    
+    response = VoiceResponse()
+    connect = Connect()
+    stream = connect.stream(url=f"{stream_url}/twilio/stream")
+    stream.parameter(name="call_sid", value=call_sid)
+    response.append(connect)
+    return Response(content=str(response), media_type='text/xml')
+
+
 @router.post("/process_speech")
 async def process_speech(request: Request):
     try:
         form_data = await request.form()
         call_sid = form_data.get('CallSid')
         speech_result = form_data.get('SpeechResult', '')
+        usage_meter.bind(call_sid)  # LLM usage of this turn, and its background tasks, is billed to the call
         
         # Add print message for user input
         print(f"User input received:\n {speech_result}")  # Print user input
         
-        if call_sid not in ai_agents:
-            ai_agents[call_sid] = AI_SalesAgent()
-        agent = ai_agents[call_sid]
+        # Speech before the previous reply was fetched makes that reply stale
+        was_interrupted = False
+        stale = pending_responses.pop(call_sid, None)
+        if stale and not stale[1].done():
+            stale[1].cancel()
+            was_interrupted = True
         
-        response_text, fillers, end_call = await agent.generate_response(speech_result)
+        agent = ai_agents.get(call_sid)
+        if agent is None:
+            agent = AI_SalesAgent()
+        
+        if settings.LLM_STREAMING:
+            return await stream_first_sentence(call_sid, agent, speech_result, was_interrupted)
+
+        response_text, fillers, end_call = await agent.generate_response(speech_result, was_interrupted)
+        save_agent(call_sid, agent)
         
         response = VoiceResponse()
         
         if end_call:
-            response.say(response_text)
+            speak(response, response_text)
             response.hangup()
         else:
             gather = Gather(
@@ -98,41 +176,138 @@ async def process_speech(request: Request):
                     gather.pause(length=0.3)
             
             # Add the main response
-            gather.say(f'<speak><prosody rate="100%" pitch="+2st" volume="loud">{response_text}</prosody></speak>', ssml=True)
+            speak(gather, response_text, volume="loud")
             response.append(gather)
         return Response(content=str(response), media_type='text/xml')
             
     except Exception as e:
         logger.error(f"Error processing speech: {str(e)}")  # Log the error
         response = VoiceResponse()
-        response.say("I apologize, but I'm having trouble. Could you please repeat that?")
+        speak(response, CALL_ERROR_REPLY)
+        response.redirect('/twilio/voice')
+        return Response(content=str(response), media_type='text/xml')
+
+async def collect_segments(call_sid: str, agent: AI_SalesAgent, segments, tts: bool) -> dict:
+    """Gather the rest of a streamed reply in the first sentence's voice.
+
+    ``tts`` says the first sentence was played from the TTS cache; the rest is then
+    rendered in full before it is published, so the whole reply is <Play>.
+    """
+    collected = []
+    renders = []
+    async for segment in segments:
+        collected.append(segment)
+        if tts:
+            # Render each sentence while the first one plays
+            renders.append(tts_cache.prefetch(segment))
+    if renders:
+        await asyncio.gather(*renders)
+    save_agent(call_sid, agent)
+    # Publish for whichever worker receives Twilio's /process_speech/continue request
+    reply = {"segments": collected, "end_call": agent.end_call_confirmed, "tts": tts}
+    streamed_replies[call_sid] = reply
+    return reply
+
+async def wait_for_streamed_reply(call_sid: str) -> dict:
+    """Poll the shared store for a reply that is being streamed on another worker."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.OPENAI_TIMEOUT
+    while loop.time() < deadline:
+        reply = streamed_replies.pop(call_sid, None)
+        if reply is not None:
+            return reply
+        await asyncio.sleep(0.05)
+    logger.warning(f"Timed out waiting for the streamed reply of call {call_sid}")
+    return {"segments": [], "end_call": False, "tts": False}
+
+async def stream_first_sentence(call_sid: str, agent: AI_SalesAgent, speech_result: str, was_interrupted: bool = False) -> Response:
+    """Speak the first streamed sentence immediately and let Twilio fetch the rest via redirect."""
+    segments = agent.stream_response(speech_result, was_interrupted)
+    first_segment = await anext(segments, "")
+    # Nothing is synthesized before the first audio: <Play> only if the sentence is already
+    # cached (stock phrases), otherwise <Say>; the rest of the reply keeps that voice
+    tts = bool(settings.TTS_ENABLED and first_segment and tts_cache.cached_url(first_segment))
+    # Keep generating in the background while Twilio plays the first sentence
+    pending_responses[call_sid] = (agent, asyncio.create_task(collect_segments(call_sid, agent, segments, tts)))
+    ai_agents[call_sid] = agent
+
+    # Inside a <Gather> so the caller can talk over the first sentence; /process_speech then
+    # cancels the rest. With no speech, Twilio falls through to the redirect after ``timeout``.
+    response = VoiceResponse()
+    gather = Gather(
+        input='speech',
+        action='/process_speech',
+        method='POST',
+        language='en-US',
+        speechTimeout=1,
+        timeout=1,
+        bargeIn=True
+    )
+    speak_reply(gather, [first_segment], volume="loud", tts=tts)
+    response.append(gather)
+    response.redirect('/process_speech/continue', method='POST')
+    return Response(content=str(response), media_type='text/xml')
+
+@router.post("/process_speech/continue")
+async def continue_speech(request: Request):
+    try:
+        form_data = await request.form()
+        call_sid = form_data.get('CallSid')
+        pending = pending_responses.pop(call_sid, None)
+        if pending:
+            _, task = pending
+            try:
+                reply = await task
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise  # This request was cancelled, not the reply
+                raise RuntimeError("Streamed reply was cancelled")
+            streamed_replies.pop(call_sid, None)
+        else:
+            reply = await wait_for_streamed_reply(call_sid)
+
+        response = VoiceResponse()
+        if reply["end_call"]:
+            speak_reply(response, reply["segments"], tts=reply.get("tts", False))
+            response.hangup()
+        else:
+            gather = Gather(
+                input='speech',
+                action='/process_speech',
+                method='POST',
+                language='en-US',
+                speechTimeout=1,
+                timeout=5
+            )
+            speak_reply(gather, reply["segments"], volume="loud", tts=reply.get("tts", False))
+            response.append(gather)
+        return Response(content=str(response), media_type='text/xml')
+
+    except Exception as e:
+        logger.error(f"Error continuing streamed speech: {str(e)}")
+        response = VoiceResponse()
+        speak(response, CALL_ERROR_REPLY)
         response.redirect('/twilio/voice')
         return Response(content=str(response), media_type='text/xml')
 
 @router.post("/upload_knowledge")
-async def upload_knowledge(file: UploadFile = File(...)):
+async def upload_knowledge(file: UploadFile = File(...), doc_id: str = Form(None)):
     try:
-        content = await file.read()
-        pdf_processor = PDFProcessor()
-        
-        pdf_text = pdf_processor.extract_text_from_pdf(content)
-        if not pdf_text:
+        _, task = await pdf_ingestion.start(file.file, file.filename, doc_id)
+        job = await task
+
+        if job["status"] == "failed":
             return JSONResponse(
-                {"status": "error", "message": "Failed to extract text from PDF"},
-                status_code=400
+                {"status": "error", "message": job["error"]},
+                status_code=400 if job["error"] == NO_TEXT_ERROR else 500
             )
         
-        chunks = pdf_processor.process_text_for_rag(pdf_text)
-        
-        for agent in ai_agents.values():
-            agent.documents = chunks
-            agent.embeddings = agent.encoder.encode(chunks)
-            agent.sources = [file.filename] * len(chunks)
-            agent.page_numbers = [1] * len(chunks)
-        
         return JSONResponse({
             "status": "success",
-            "chunks_processed": len(chunks)
+            "doc_id": job["doc_id"],
+            "chunks_processed": job["chunks_processed"],
+            "pages_processed": job["pages_done"],
+            "knowledge_version": job["knowledge_version"]
         })
         
     except Exception as e:
@@ -142,12 +317,54 @@ async def upload_knowledge(file: UploadFile = File(...)):
             status_code=500
         )
 
+@router.post("/upload_knowledge/jobs")
+async def start_knowledge_upload(file: UploadFile = File(...), doc_id: str = Form(None)):
+    """Start ingesting a PDF in the background and return a job id to poll."""
+    try:
+        job_id, _ = await pdf_ingestion.start(file.file, file.filename, doc_id)
+        return JSONResponse({"status": "accepted", "job_id": job_id}, status_code=202)
+    except Exception as e:
+        logger.error(f"Error starting knowledge upload: {str(e)}")
+        return JSONResponse(
+            {"status": "error", "message": str(e)},
+            status_code=500
+        )
+
+@router.get("/upload_knowledge/jobs/{job_id}")
+async def get_knowledge_upload(job_id: str):
+    job = pdf_ingestion.get_job(job_id)
+    if job is None:
+        return JSONResponse({"status": "error", "message": "Unknown job"}, status_code=404)
+    return JSONResponse(job)
+
+@router.get("/knowledge")
+async def list_knowledge():
+    return JSONResponse({
+        "knowledge_version": knowledge_index.version,
+        "documents": knowledge_index.list_documents()
+    })
+
+@router.delete("/knowledge/{doc_id}")
+async def delete_knowledge(doc_id: str):
+    try:
+        removed = await asyncio.get_running_loop().run_in_executor(None, knowledge_index.remove_document, doc_id)
+        if not removed:
+            return JSONResponse({"status": "error", "message": "Unknown document"}, status_code=404)
+        return JSONResponse({"status": "success", "knowledge_version": knowledge_index.version})
+    except Exception as e:
+        logger.error(f"Error deleting knowledge {doc_id}: {str(e)}")
+        return JSONResponse(
+            {"status": "error", "message": str(e)},
+            status_code=500
+        )
+
 @router.post("/make_call")
 async def make_outbound_call(request: Request):
     try:
         data = await request.json()
         phone_number = data.get('phone_number')
         name = data.get('name')
+        campaign = data.get('campaign')
         
         if not phone_number:
             return JSONResponse({
@@ -159,21 +376,24 @@ async def make_outbound_call(request: Request):
             phone_number = '+' + phone_number
         
         ngrok_url = settings.NGROK_URL
-        twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        twilio_client = client_registry.twilio_client
         
         # Make the initial call
         call = twilio_client.calls.create(
             to=phone_number,
             from_=settings.TWILIO_FROM_NUMBER,
-            url=f"{ngrok_url}/twilio/voice",  # Initial URL
+            url=f"{ngrok_url}/twilio/voice/stream" if settings.VOICE_MODE == "stream" else f"{ngrok_url}/twilio/voice",  # Initial URL
             status_callback=f"{ngrok_url}/call_ends",  # Updated: removed path parameter
             status_callback_event=['completed', 'failed']
         )
         
         # Store the name with the call_sid
-        global caller_names
         caller_names[call.sid] = name
         logger.info(f"Stored name {name} for call {call.sid}")
+        usage_meter.assign_campaign(call.sid, campaign)
+        # Render the personalised greeting while the phone is still ringing
+        if settings.TTS_ENABLED:
+            tts_cache.prefetch(outbound_greeting(name))
         
         # Set the status callback
         call = twilio_client.calls(call.sid).update(
@@ -198,13 +418,11 @@ async def handle_call_status(call_sid: str, request: Request):
         call_status = form_data.get('CallStatus')
         
         if call_status in ['completed', 'failed', 'busy', 'no-answer', 'canceled']:
-            # Clean up the caller_names dictionary
-            global caller_names
-            if call_sid in caller_names:
-                del caller_names[call_sid]
+            # Clean up the caller_names store
+            if caller_names.pop(call_sid, None) is not None:
                 logger.info(f"Cleaned up name for call {call_sid}")
         
-        twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        twilio_client = client_registry.twilio_client
         call = twilio_client.calls(call_sid).fetch()
         
         # Map Twilio status to our status
@@ -260,8 +478,18 @@ async def call_ends(request: Request = None, call_sid: str = None):
                     }
                 )
                 
+        usage_meter.bind(call_sid)
         # Check if we have an agent for this call_sid
-        if call_sid not in ai_agents:
+        agent = ai_agents.get(call_sid)
+        if agent is not None and len(agent.conversation_history) == 1:
+            # Pre-built when the call was answered, but the caller never spoke
+            ai_agents.end(call_sid)
+            agent = None
+        if agent is None:
+            caller_names.pop(call_sid, None)
+            finished_summary = call_summaries.get(call_sid)
+            if finished_summary:
+                return JSONResponse(content=finished_summary)
             logger.warning(f"No active conversation found for Call SID: {call_sid}")
             return JSONResponse(
                 status_code=404,
@@ -271,8 +499,14 @@ async def call_ends(request: Request = None, call_sid: str = None):
                 }
             )
 
-        agent = ai_agents[call_sid]
+        pending = pending_responses.pop(call_sid, None)
+        if pending:
+            await pending[1]  # Let the streamed turn land in the history before summarizing
+        await agent.await_pending_entities()
+        # The call is over: release the session and run the end-of-call hooks
+        ai_agents.end(call_sid)
         await agent.print_summary()
+        call_summaries[call_sid] = agent.get_latest_summary()
 
         try:
             # Check for required entities and ensure they are not null
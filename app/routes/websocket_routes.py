@@ -1,8 +1,17 @@
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
 import json
 import base64
-import io
-from ..services.ai_agent import AI_SalesAgent
+import asyncio
+import logging
+from ..services.ai_agent import AI_SalesAgent, ai_agents
+from ..services.audio_frontend import CallAudioFrontend
+from ..services.media_stream import MediaStreamSpeaker
+from ..services.usage_meter import usage_meter
+from ..config import settings
+from .twilio_routes import caller_names, outbound_greeting, save_agent
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -16,42 +25,120 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception:
         pass
 
+async def send_partial_transcript(agent: AI_SalesAgent, speaker: MediaStreamSpeaker, audio):
+    """Show a text client what the caller has said so far; only runs when replies are sent as text."""
+    text = await agent.process_audio_to_text(audio)
+    if text:
+        await speaker.send_text(json.dumps({"event": "partial", "text": text}))
+
+async def respond_to_utterance(websocket: WebSocket, agent: AI_SalesAgent, speaker: MediaStreamSpeaker, call_sid: str, unanswered: list, was_interrupted: bool):
+    """Answer the caller's unanswered utterances; runs as a task so barge-in can cancel it.
+
+    Transcriptions run outside this task, so an utterance whose reply was cut off
+    before the agent recorded it goes back to ``unanswered`` and is answered with the next one.
+    """
+    transcriptions = list(unanswered)
+    await asyncio.wait(transcriptions)
+    for transcription in transcriptions:
+        unanswered.remove(transcription)
+    text = " ".join(transcription.result() for transcription in transcriptions if transcription.result())
+    if not text:
+        return
+    
+    # Sentence N+1 is synthesized while sentence N plays
+    turns = len(agent.conversation_history)
+    try:
+        await speaker.speak_stream(agent.stream_response(text, was_interrupted=was_interrupted))
+    except asyncio.CancelledError:
+        if len(agent.conversation_history) == turns:
+            unanswered[:0] = transcriptions  # Cut off before the agent recorded the turn
+        raise
+    if call_sid:
+        save_agent(call_sid, agent)
+    
+    if agent.end_call_confirmed:
+        # Let the goodbye finish playing; closing the stream ends the <Connect> and the call
+        await speaker.wait_until_played()
+        await websocket.close()
+
 @router.websocket("/twilio/stream")
 async def handle_twilio_stream(websocket: WebSocket):
+    """Full-duplex Twilio Media Streams handler: caller audio in, synthesized μ-law speech out."""
     await websocket.accept()
     
+    agent = None
+    speaker = MediaStreamSpeaker(websocket.send_text)
     try:
-        agent = AI_SalesAgent()
-        greeting = "Hello! I'm calling from our company. How can I help you today?"
-        await websocket.send_text(json.dumps({"event": "start", "text": greeting}))
-        
-        audio_buffer = io.BytesIO()
+        # Only complete utterances reach ASR; partial hypotheses only when a text client shows them
+        frontend = CallAudioFrontend(partials=not settings.TTS_ENABLED)
+        partial_task = None
+        unanswered = []  # Transcriptions of utterances the agent has not answered yet
+        barged_in = False
+        call_sid = None
         
         while True:
             message = await websocket.receive_text()
             message_data = json.loads(message)
             
             if message_data["event"] == "start":
+                start = message_data.get("start", {})
+                speaker.stream_sid = message_data.get("streamSid") or start.get("streamSid")
+                call_sid = start.get("callSid") or start.get("customParameters", {}).get("call_sid")
+                usage_meter.bind(call_sid)
+                agent = (ai_agents.get(call_sid) if call_sid else None) or AI_SalesAgent()
+                greeting = outbound_greeting(caller_names.get(call_sid, '') if call_sid else '')
+                agent.audio_manager.start_response(speaker.speak(greeting))
                 continue
             
-            if message_data["event"] == "media":
+            if message_data["event"] == "mark":
+                speaker.on_mark(message_data["mark"]["name"])
+                continue
+            
+            if message_data["event"] == "stop":
+                break
+            
+            if message_data["event"] == "media" and agent is not None:
                 audio_data = base64.b64decode(message_data["media"]["payload"])
-                audio_buffer.write(audio_data)
                 
-                if audio_buffer.tell() > 8000:
-                    audio_buffer.seek(0)
-                    audio_chunk = audio_buffer.read()
-                    audio_buffer = io.BytesIO()
+                for kind, audio in frontend.push(audio_data):
+                    if kind == "speech_start":
+                        continue
                     
-                    text = await agent.process_audio_to_text(audio_chunk)
+                    if kind == "barge_in":
+                        # Sustained speech, not a cough: drop the stale reply and any audio Twilio still has queued
+                        barged_in = True
+                        interrupted = await agent.audio_manager.interrupt()
+                        if interrupted or speaker.playing:
+                            agent.audio_manager.interrupted = True
+                            await speaker.clear()
+                        continue
                     
-                    if text:
-                        response_text, _, end_call = await agent.generate_response(text)
-                        await websocket.send_text(json.dumps({"event": "media", "text": response_text}))
-                        
-                        if end_call:
-                            await websocket.close()
-                            break
+                    if kind == "partial":
+                        # At most one partial hypothesis in flight per call
+                        if partial_task is None or partial_task.done():
+                            partial_task = asyncio.create_task(send_partial_transcript(agent, speaker, audio))
+                        continue
                     
-    except Exception:
-        pass
\ No newline at end of file
+                    if partial_task is not None:
+                        partial_task.cancel()
+                    if not barged_in and (agent.audio_manager.speaking or speaker.playing):
+                        logger.debug("Ignoring a short noise while the agent is talking")
+                        continue
+                    barged_in = False
+                    unanswered.append(asyncio.create_task(agent.process_audio_to_text(audio)))
+                    agent.audio_manager.start_response(respond_to_utterance(
+                        websocket, agent, speaker, call_sid, unanswered, agent.audio_manager.consume_interruption()
+                    ))
+                
+                if agent.end_call_confirmed and not agent.audio_manager.speaking:
+                    break
+                    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in Twilio media stream: {str(e)}")
+    finally:
+        if agent is not None:
+            await agent.audio_manager.interrupt()
+        if websocket.application_state == WebSocketState.CONNECTED:
+            await websocket.close()
@@ -1,38 +1,46 @@
 from datetime import datetime
 import json
-import io
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import logging
-from openai import OpenAI
-from smallest import Smallest
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+import time
 from typing import Optional
 from ..config import settings
-from ..utils.constants import END_CALL_PHRASES, DEFAULT_SALES_PROMPT
+from ..utils.constants import (
+    DEFAULT_SALES_PROMPT, NO_INPUT_REPLY, END_CALL_PROMPT, CALL_ENDED_REPLY,
+    INVALID_EMAIL_GOODBYE, GOODBYE_REPLY, ERROR_REPLY, ENTITY_REPLY_INSTRUCTIONS, HISTORY_SUMMARY_PROMPT,
+    CONTINUE_CALL_REPLY, EMAIL_CAPTURED_REPLY, FIRST_TURN_REPLY
+)
 from ..models.retrieval import RetrievalResult
 from .audio_manager import AudioStreamManager
-import whisper
 import re
-from .google_calendar_manager import GoogleCalendarManager  # Import GoogleCalendarManager
-from .salesforce_integration import SalesforceIntegration  # Import SalesforceIntegration
-from functools import lru_cache
+from .client_registry import client_registry
+from .sentence_buffer import SentenceBuffer
+from .entity_parser import EntityStreamParser, parse_entities_block
+from .session_store import create_session_store
+from .knowledge_index import knowledge_index
+from .embedding_service import query_embedder
+from .asr_pool import asr_pool
+from .prompt_builder import prompt_builder, prompt_version
+from .response_cache import response_cache, is_context_free, factual_answer
+from .intent_engine import intent_engine, spoken_email, spoken_time, END_CALL_PATTERN, EMAIL_FILLER, SCHEDULING_PATTERN
 
-# Define ai_agents as a global dictionary
-ai_agents = {}
+# Live agents keyed by CallSid, bounded by idle TTL and max size. Out-of-process
+# backends store AI_SalesAgent.to_state() so any worker can resume the call.
+ai_agents = create_session_store(
+    "ai_agents",
+    dumps=lambda agent: json.dumps(agent.to_state()),
+    loads=lambda data: AI_SalesAgent.from_state(json.loads(data))
+)
 
 logger = logging.getLogger(__name__)
-executor = ThreadPoolExecutor(max_workers=10)
 
-model = whisper.load_model("base") # or small
-# model = WhisperModel("small", device="cpu", compute_type="int8")
+FIRST_TURN_MAX_WORDS = 8  # Longer first replies carry content the LLM should answer
+
 
 class AI_SalesAgent:
-    def __init__(self, system_prompt=None, encoder=None): 
+    def __init__(self, system_prompt=None, encoder=None, registry=None): 
         self.system_prompt = system_prompt or DEFAULT_SALES_PROMPT
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.smallestai_client = Smallest(api_key=settings.SMALLEST_API_KEY)
+        self.registry = registry or client_registry  # Shared, pooled clients borrowed per call
         self.conversation_history = [{"role": "system", "content": self.system_prompt}]
         self.end_call_detected = False
         self.end_call_confirmed = False
@@ -46,59 +54,103 @@ class AI_SalesAgent:
             "industry": None
         }
         self.audio_manager = AudioStreamManager()
-        self.encoder = encoder  # Use the encoder passed as an argument
-        self.documents = []
-        self.embeddings = []
-        self.sources = []
-        self.page_numbers = []
+        self._encoder = encoder  # Falls back to the registry's shared encoder
+        self.knowledge = knowledge_index  # Shared, read-only; never copied per agent
         self.conversation_summary = None
         self.raw_entity_history = []
-        self.calendar_manager = GoogleCalendarManager()  # Initialize Google Calendar Manager
-        self.salesforce_integration = SalesforceIntegration()  # Initialize Salesforce Integration
+        self.pending_entities_task = None  # Entity parsing that finishes after a streamed reply is spoken
+        self.sent_entities = {}  # Entity values the model has already been told about
+        self.history_summary = None  # Rolling summary of turns folded out of the prompt
+        self.summarized_upto = 1  # conversation_history[1:summarized_upto] is covered by history_summary
+        self.compaction_task = None
 
-        # Preload the OpenAI model
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
+        # Preload the OpenAI model once per process, on the loop that will serve the calls
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop and self.registry.claim_openai_warmup():
             loop.create_task(self.preload_openai_model())
-        else:
-            asyncio.run(self.preload_openai_model())
+
+    def to_state(self) -> dict:
+        """Return the JSON-serializable conversation state shared between workers."""
+        return {
+            "system_prompt": None if self.system_prompt == DEFAULT_SALES_PROMPT else self.system_prompt,
+            "conversation_history": [
+                message for message in self.conversation_history if message["role"] != "system"
+            ],
+            "client_entities": self.client_entities,
+            "end_call_detected": self.end_call_detected,
+            "end_call_confirmed": self.end_call_confirmed,
+            "conversation_summary": self.conversation_summary,
+            "raw_entity_history": self.raw_entity_history,
+            "sent_entities": self.sent_entities,
+            "history_summary": self.history_summary,
+            "summarized_upto": self.summarized_upto
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "AI_SalesAgent":
+        """Rebuild an agent from to_state() output; clients come from the local registry."""
+        agent = cls(system_prompt=state.get("system_prompt"))
+        agent.conversation_history.extend(state.get("conversation_history", []))
+        agent.client_entities.update(state.get("client_entities", {}))
+        agent.end_call_detected = state.get("end_call_detected", False)
+        agent.end_call_confirmed = state.get("end_call_confirmed", False)
+        agent.conversation_summary = state.get("conversation_summary")
+        agent.raw_entity_history = state.get("raw_entity_history", [])
+        agent.sent_entities = state.get("sent_entities", {})
+        agent.history_summary = state.get("history_summary")
+        agent.summarized_upto = state.get("summarized_upto", 1)
+        return agent
+
+    @property
+    def openai_client(self):
+        return self.registry.openai_client
+
+    @property
+    def llm(self):
+        return self.registry.llm
+
+    @property
+    def encoder(self):
+        return self._encoder or self.registry.encoder
+
+    @property
+    def smallestai_client(self):
+        return self.registry.smallest_client
+
+    @property
+    def calendar_manager(self):
+        return self.registry.calendar_manager
+
+    @property
+    def salesforce_integration(self):
+        return self.registry.salesforce_integration
 
     async def preload_openai_model(self):
         """Preload the OpenAI model to reduce initial delay."""
         try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Preloading model."},
-                    {"role": "user", "content": "Hello"}
-                ],
-                temperature=0,
-                max_tokens=1
-            ))
+            await self.llm.warmup()
             logger.info("OpenAI model preloaded successfully.")
         except Exception as e:
             logger.error(f"Error preloading OpenAI model: {str(e)}")
 
+    @property
+    def turn_system_prompt(self) -> str:
+        return f"{self.system_prompt}\n\n{ENTITY_REPLY_INSTRUCTIONS}"
+
     def check_for_end_call(self, text: str) -> bool:
-        return any(phrase.lower() in text.lower() for phrase in END_CALL_PHRASES)\
+        return bool(END_CALL_PATTERN.search(text))
 
-    async def process_audio_to_text(self, audio_data: bytes) -> str:
+    async def process_audio_to_text(self, samples) -> str:
+        """Transcribe 16 kHz float32 PCM (see CallAudioFrontend) in the ASR worker pool."""
         try:
-            temp_file = io.BytesIO(audio_data)
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, lambda: self.transcribe_audio(temp_file))
-            transcribed_text = response
-            return transcribed_text
+            return await asr_pool.transcribe(samples)
         except Exception as e:
             logger.error(f"Error in audio transcription: {str(e)}", exc_info=True)
             return ""
 
-    def transcribe_audio(temp_file: io.BytesIO) -> str:
-        """Helper function to transcribe audio from a BytesIO object using Whisper-Tiny."""
-        temp_file.seek(0)  # Reset file pointer
-        return model.transcribe(temp_file)["text"]
-
     def sanitize_email(self, email: str) -> str:
         """Sanitize and validate the email address."""
         # Remove any unwanted characters and spaces
@@ -108,110 +160,246 @@ class AI_SalesAgent:
             return email
         return None  # Return None if the email is invalid
 
-    @lru_cache(maxsize=128)
     def extract_entities(self, response_text: str) -> tuple[str, Optional[dict]]:
-        """Extract entities with improved parsing."""
+        """Split a complete response into spoken text and parsed entities."""
         try:
-            # Split on [[ENTITIES]] and [[END_ENTITIES]]
-            parts = response_text.split("[[ENTITIES]]")
-            spoken_response = parts[0].strip()
-            entities = None
-            
-            if len(parts) > 1:
-                entities_text = parts[1].split("[[END_ENTITIES]]")[0].strip()
-                logger.debug(f"Raw entities text found: {entities_text}")
-                
-                if entities_text:
-                    try:
-                        # Clean and parse the JSON
-                        cleaned_text = entities_text.replace("'", '"').strip()
-                        entities = json.loads(cleaned_text)
-                        
-                        # Ensure proper structure
-                        if not isinstance(entities, dict):
-                            entities = {"entities": {}}
-                        elif "entities" not in entities:
-                            entities = {"entities": entities}
-                        
-                        logger.debug(f"Successfully parsed entities: {entities}")
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON parsing error: {str(e)}, Raw text: {entities_text}")
-            
-            # Ensure that the response does not include extra data
-            return spoken_response, entities
+            parser = EntityStreamParser()
+            parser.feed(response_text)
+            parser.close()
+            logger.debug(f"Raw entities text found: {parser.entities_text}")
+            return parser.spoken_text, parse_entities_block(parser.entities_text)
             
         except Exception as e:
             logger.error(f"Error in extract_entities: {str(e)}")
             return response_text, None
 
-    async def generate_response(self, user_input: str, was_interrupted: bool = False) -> tuple[str, None, bool]:
-        try:
-            if not user_input:
-                return "I didn't catch that. Could you please repeat?", None, False
+    def _record_local_turn(self, user_input: str, reply: str):
+        self.conversation_history.append({"role": "user", "content": user_input})
+        self.conversation_history.append({"role": "assistant", "content": reply})
 
-            if self.end_call_detected:
-                if "yes" in user_input.lower() or "okay" in user_input.lower():
-                    self.end_call_confirmed = True
-                    logger.debug(f"Current client entities: {self.client_entities}")
-                    logger.debug(f"Raw entity history length: {len(self.raw_entity_history)}")
-                    self.print_raw_entities()
-
-                    # Sanitize email before returning
-                    sanitized_email = self.sanitize_email(self.client_entities.get('email', ''))
-                    if sanitized_email:
-                        self.client_entities['email'] = sanitized_email
-                    else:
-                        logger.error("Invalid email address provided. Cannot create calendar event or Salesforce lead.")
-                        return "Thank you for your time. However, there was an issue with the email provided.", None, True
-
-                    return "Thank you for your time. The call has ended.", None, True  # Return without creating events
-
-            if self.check_for_end_call(user_input) and not self.end_call_detected:
-                self.end_call_detected = True
-                return "Would you like to end our conversation?", None, False
-
-            # Parse the current conversation for entities
-            current_entities = self.parse_conversation_for_entities(user_input)
-            
-            # Create the prompt with the current entity state
-            entity_state = {
-                "entities": {
-                    "name": current_entities.get("name", self.client_entities["name"]),
-                    "email": current_entities.get("email", self.client_entities["email"]),
-                    "company_name": current_entities.get("company_name", self.client_entities["company_name"]),
-                    "requirements": current_entities.get("requirements", self.client_entities["requirements"]),
-                    "meeting_date": current_entities.get("meeting_date", self.client_entities["meeting_date"]),
-                    "meeting_time": current_entities.get("meeting_time", self.client_entities["meeting_time"]),
-                    "industry": current_entities.get("industry", self.client_entities["industry"])
-                }
+    async def _local_response(self, user_input: str) -> Optional[tuple[str, None, bool]]:
+        """Return a reply for turns the local intent engine can answer without the LLM, or None.
+
+        Only turns that used to go to the LLM count as avoided calls; silence and the
+        end-call prompts never did.
+        """
+        intent_engine.record_turn()
+        if not user_input:
+            return NO_INPUT_REPLY, None, False
+
+        if self.end_call_detected:
+            answer = await intent_engine.confirmation(user_input)
+            if answer == "deny":
+                self.end_call_detected = False
+                self._record_local_turn(user_input, CONTINUE_CALL_REPLY)
+                intent_engine.record_avoided("continue_call")
+                return CONTINUE_CALL_REPLY, None, False
+            if answer == "affirm":
+                self.end_call_confirmed = True
+                logger.debug(f"Current client entities: {self.client_entities}")
+                logger.debug(f"Raw entity history length: {len(self.raw_entity_history)}")
+                self.print_raw_entities()
+
+                # Sanitize email before returning
+                sanitized_email = self.sanitize_email(self.client_entities.get('email', ''))
+                if sanitized_email:
+                    self.client_entities['email'] = sanitized_email
+                else:
+                    logger.error("Invalid email address provided. Cannot create calendar event or Salesforce lead.")
+                    return INVALID_EMAIL_GOODBYE, None, True
+
+                return CALL_ENDED_REPLY, None, True  # Return without creating events
+        elif await intent_engine.is_end_call(user_input):
+            self.end_call_detected = True
+            self._record_local_turn(user_input, END_CALL_PROMPT)
+            return END_CALL_PROMPT, None, False
+
+        # The scripted opening needs no LLM
+        if settings.FIRST_TURN_FAST_PATH and len(self.conversation_history) == 1:
+            if len(user_input.split()) <= FIRST_TURN_MAX_WORDS and await intent_engine.confirmation(user_input) != "deny":
+                # No slot extraction here: "who is calling today?" is not a meeting date
+                self._record_local_turn(user_input, FIRST_TURN_REPLY)
+                intent_engine.record_avoided("first_turn")
+                return FIRST_TURN_REPLY, None, False
+
+        # A caller who only spells out an email gets the next question without a round trip
+        email, leftover = spoken_email(user_input)
+        if email and not self.client_entities.get("company_name") and all(word in EMAIL_FILLER for word in leftover):
+            self.client_entities["email"] = email
+            reply = EMAIL_CAPTURED_REPLY.format(email=email)
+            self._record_local_turn(user_input, reply)
+            intent_engine.record_avoided("email")
+            return reply, None, False
+
+        return None
+
+    def _build_messages(self, user_input: str, was_interrupted: bool = False) -> list[dict]:
+        """Assemble the chat messages for a turn within the prompt token budget.
+
+        Only entity values the model has not seen yet are sent, and the user turn is
+        recorded in the history so later turns and the call summary can see it.
+        """
+        # Parse the current conversation for entities
+        current_entities = self.parse_conversation_for_entities(user_input)
+        
+        # Create the prompt with the current entity state
+        entity_state = {
+            "entities": {
+                "name": current_entities.get("name", self.client_entities["name"]),
+                "email": current_entities.get("email", self.client_entities["email"]),
+                "company_name": current_entities.get("company_name", self.client_entities["company_name"]),
+                "requirements": current_entities.get("requirements", self.client_entities["requirements"]),
+                "meeting_date": current_entities.get("meeting_date", self.client_entities["meeting_date"]),
+                "meeting_time": current_entities.get("meeting_time", self.client_entities["meeting_time"]),
+                "industry": current_entities.get("industry", self.client_entities["industry"])
             }
-            
-            # Append user input with instructions for entity response
-            enhanced_prompt = (
-                f"{user_input}\n\n"
-                f"Current entities state: {json.dumps(entity_state)}\n"
-                "Important: Update and include all entities in your response after [[ENTITIES]] tag, "
-                "even if they haven't changed. Use format:\n"
-                "Your response text\n"
-                "[[ENTITIES]]\n"
-                '{"entities": {...}}\n'
-                "[[END_ENTITIES]]"
-            )
-            
-            # Run the OpenAI API call concurrently
-            loop = asyncio.get_event_loop()
-            openai_task = loop.run_in_executor(None, lambda: self.openai_client.chat.completions.create(
+        }
+        
+        if was_interrupted:
+            user_input = f"(I interrupted your previous reply.) {user_input}"
+        
+        # Send only what changed since the model last saw the entities
+        entity_delta = {
+            key: value for key, value in entity_state["entities"].items()
+            if value and self.sent_entities.get(key) != value
+        }
+        self.sent_entities.update(entity_delta)
+        turn = user_input
+        if entity_delta:
+            turn = f"{user_input}\n\nEntity updates: {json.dumps(entity_delta)}"
+        
+        messages = prompt_builder.build(
+            self.turn_system_prompt,
+            self.conversation_history[self.summarized_upto:],
+            turn,
+            summary=self.history_summary,
+            known_entities=self.client_entities
+        )
+        self.conversation_history.append({"role": "user", "content": turn})
+        return messages
+
+    def _maybe_compact_history(self):
+        """Fold older turns into the rolling summary in the background once they outgrow their budget."""
+        if self.compaction_task and not self.compaction_task.done():
+            return
+        recent = self.conversation_history[self.summarized_upto:]
+        if len(recent) <= settings.PROMPT_KEEP_MESSAGES:
+            return
+        if prompt_builder.history_tokens(recent) <= settings.PROMPT_HISTORY_TOKENS:
+            return
+        self.compaction_task = asyncio.create_task(self._compact_history())
+
+    async def _compact_history(self):
+        cutoff = len(self.conversation_history) - settings.PROMPT_KEEP_MESSAGES
+        transcript = "\n".join(
+            f"{'User' if msg['role'] == 'user' else 'AI'}: {msg['content']}"
+            for msg in self.conversation_history[self.summarized_upto:cutoff]
+        )
+        if self.history_summary:
+            transcript = f"Previous summary: {self.history_summary}\n\n{transcript}"
+        try:
+            response = await self.llm.chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    *self.conversation_history,
-                    {"role": "user", "content": enhanced_prompt}
+                    {"role": "system", "content": HISTORY_SUMMARY_PROMPT},
+                    {"role": "user", "content": transcript}
                 ],
                 temperature=0,
-                max_tokens=150
-            ))
+                max_tokens=200,
+                purpose="compaction"
+            )
+            self.history_summary = response.choices[0].message.content.strip()
+            self.summarized_upto = cutoff
+            logger.debug(f"Folded conversation history up to message {cutoff} into the rolling summary")
+        except Exception as e:
+            logger.error(f"Error compacting conversation history: {str(e)}")
+
+    def _record_entities(self, response_text: str, entities: Optional[dict]):
+        """Store the raw response and merge extracted entities into the client state."""
+        if entities:
+            logger.debug(f"Extracted entities: {entities}")
+            try:
+                # Store the raw response and entities
+                self.raw_entity_history.append({
+                    'timestamp': datetime.now().isoformat(),
+                    'raw_response': response_text,
+                    'extracted_entities': entities,
+                    'client_entities_state': self.client_entities.copy()
+                })
+                self.update_entities(entities)
+            except Exception as e:
+                logger.error(f"Error storing entities: {str(e)}")
+
+    def _finalize_response(self, response_text: str, spoken_response: str, entities: Optional[dict]):
+        """Record extracted entities and the spoken reply once a turn is complete."""
+        self._record_entities(response_text, entities)
+        self.conversation_history.append({"role": "assistant", "content": spoken_response})
+        self._maybe_compact_history()
+
+    async def await_pending_entities(self):
+        """Make sure the previous turn's entity block has been applied before building a prompt."""
+        if self.pending_entities_task:
+            task, self.pending_entities_task = self.pending_entities_task, None
+            try:
+                await task
+            except Exception as e:
+                logger.error(f"Error applying streamed entities: {str(e)}")
+
+    async def _cached_response(self, user_input: str, was_interrupted: bool):
+        """Answer a context-free question from the semantic cache; returns (answer or None, embedding)."""
+        if not settings.RESPONSE_CACHE_ENABLED or was_interrupted or self.end_call_detected:
+            return None, None
+        if not is_context_free(user_input):
+            return None, None
+        try:
+            query_embedding = await query_embedder.embed(user_input)
+        except Exception as e:
+            logger.error(f"Error embedding question for the response cache: {str(e)}")
+            return None, None
+        hit = response_cache.lookup(query_embedding, self.knowledge.version, prompt_version(self.system_prompt))
+        if hit is None:
+            return None, query_embedding
+        self._record_local_turn(user_input, hit.answer)
+        return hit.answer, query_embedding
+
+    def _cache_response(self, user_input: str, query_embedding, answer: str, llm_latency: float):
+        """Offer a finished answer to the semantic cache unless it was personalised for this caller.
 
-            response = await openai_task
+        Only the factual part is kept; the follow-up question fits this call's stage, not the next caller's.
+        """
+        if query_embedding is None:
+            return
+        answer = factual_answer(answer or "")
+        if not answer:
+            return
+        known_values = [value for value in self.client_entities.values() if isinstance(value, str) and value]
+        if any(value.lower() in answer.lower() for value in known_values):
+            return
+        response_cache.store(
+            query_embedding, user_input, answer, self.knowledge.version, prompt_version(self.system_prompt), llm_latency
+        )
+
+    async def generate_response(self, user_input: str, was_interrupted: bool = False) -> tuple[str, None, bool]:
+        try:
+            await self.await_pending_entities()
+            local_response = await self._local_response(user_input)
+            if local_response:
+                return local_response
+
+            cached, query_embedding = await self._cached_response(user_input, was_interrupted)
+            if cached:
+                return cached, None, self.end_call_detected
+
+            started = time.perf_counter()
+            messages = self._build_messages(user_input, was_interrupted)
+            
+            response = await self.llm.chat_completion(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=0,
+                max_tokens=150,
+                purpose="turn"
+            )
             
             response_text = response.choices[0].message.content
             print("***********************************")
@@ -219,30 +407,103 @@ class AI_SalesAgent:
             print("***********************************")
             
             # Extract entities and store them
-            spoken_response, entities = await loop.run_in_executor(None, lambda: self.extract_entities(response_text))
-            
-            if entities:
-                logger.debug(f"Extracted entities: {entities}")
-                try:
-                    # Store the raw response and entities
-                    self.raw_entity_history.append({
-                        'timestamp': datetime.now().isoformat(),
-                        'raw_response': response_text,
-                        'extracted_entities': entities,
-                        'client_entities_state': self.client_entities.copy()
-                    })
-                    self.update_entities(entities)
-                except Exception as e:
-                    logger.error(f"Error storing entities: {str(e)}")
-            
-            self.conversation_history.append({"role": "assistant", "content": spoken_response})
+            spoken_response, entities = self.extract_entities(response_text)
+            self._finalize_response(response_text, spoken_response, entities)
+            self._cache_response(user_input, query_embedding, spoken_response, time.perf_counter() - started)
             return spoken_response, None, self.end_call_detected
                 
         except Exception as e:
             logger.error(f"Error generating response: {str(e)}")
             if self.end_call_detected:
-                return "Thank you for your time. Have a great day!", None, True
-            return "I apologize, but I'm having trouble processing that. Could you please repeat?", None, False
+                return GOODBYE_REPLY, None, True
+            return ERROR_REPLY, None, False
+
+    def _stream_completion(self, messages: list[dict]):
+        """Yield content deltas from a streamed chat completion as they arrive."""
+        return self.llm.stream_chat_completion(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=0,
+            max_tokens=150,
+            purpose="turn"
+        )
+
+    async def stream_response(self, user_input: str, was_interrupted: bool = False):
+        """Stream the reply as speakable segments, flushing each sentence as soon as it is complete.
+
+        Speech stops at the [[ENTITIES]] sentinel; the entity JSON is drained and parsed
+        in a background task after the spoken part has already been handed over. If the
+        caller barges in, the consumer is cancelled or closes the generator; the stream is
+        closed and only the sentences already handed over are kept in the history.
+        """
+        spoken = []
+        try:
+            await self.await_pending_entities()
+            local_response = await self._local_response(user_input)
+            if local_response:
+                yield local_response[0]
+                return
+
+            cached, query_embedding = await self._cached_response(user_input, was_interrupted)
+            if cached:
+                sentence_buffer = SentenceBuffer()
+                for sentence in [*sentence_buffer.feed(f"{cached} "), sentence_buffer.flush()]:
+                    if sentence:
+                        yield sentence
+                return
+
+            started = time.perf_counter()
+            messages = self._build_messages(user_input, was_interrupted)
+            entity_parser = EntityStreamParser()
+            sentence_buffer = SentenceBuffer()
+            deltas = self._stream_completion(messages)
+            try:
+                async for delta in deltas:
+                    speech = entity_parser.feed(delta)
+                    for sentence in sentence_buffer.feed(speech):
+                        spoken.append(sentence)
+                        yield sentence
+                    if entity_parser.in_entities:
+                        break
+                else:
+                    for sentence in sentence_buffer.feed(entity_parser.close()):
+                        spoken.append(sentence)
+                        yield sentence
+
+                remainder = sentence_buffer.flush()
+                if remainder:
+                    spoken.append(remainder)
+                    yield remainder
+            except (asyncio.CancelledError, GeneratorExit):
+                # Barge-in: a cancelled consumer closes the completion stream as this unwinds
+                if spoken:
+                    self.conversation_history.append({"role": "assistant", "content": " ".join(spoken)})
+                raise
+
+            spoken_response = entity_parser.spoken_text
+            self.conversation_history.append({"role": "assistant", "content": spoken_response})
+            self._maybe_compact_history()
+            self._cache_response(user_input, query_embedding, spoken_response, time.perf_counter() - started)
+            self.pending_entities_task = asyncio.create_task(self._complete_entities(deltas, entity_parser))
+
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            if self.end_call_detected:
+                self.end_call_confirmed = True
+                yield GOODBYE_REPLY
+            else:
+                yield ERROR_REPLY
+
+    async def _complete_entities(self, deltas, entity_parser: EntityStreamParser):
+        """Drain the rest of the stream into the entity parser and apply the parsed block."""
+        async for delta in deltas:
+            entity_parser.feed(delta)
+        response_text = f"{entity_parser.spoken_text}\n[[ENTITIES]]\n{entity_parser.entities_text}\n[[END_ENTITIES]]"
+        logger.debug(f"Raw streamed response from OpenAI: {response_text}")
+
+        loop = asyncio.get_event_loop()
+        entities = await loop.run_in_executor(None, parse_entities_block, entity_parser.entities_text)
+        self._record_entities(response_text, entities)
 
     def parse_conversation_for_entities(self, user_input: str) -> dict:
         """Parse the user input for potential entities."""
@@ -274,6 +535,15 @@ class AI_SalesAgent:
         if time_match:
             entities["meeting_time"] = time_match.group(0)
         
+        # Spoken emails, dates and 12-hour times, normalized to the entity formats
+        last_reply = next(
+            (message["content"] for message in reversed(self.conversation_history) if message["role"] == "assistant"), ""
+        )
+        offered_times = bool(SCHEDULING_PATTERN.search(last_reply) or spoken_time(last_reply))
+        entities.update(intent_engine.extract_slots(user_input, scheduling=offered_times))
+        if self.client_entities.get("meeting_date"):
+            entities.pop("meeting_date", None)  # Never overwrite a date the caller already gave
+        
         return entities
 
     def update_entities(self, entities: Optional[dict]):
@@ -297,19 +567,30 @@ class AI_SalesAgent:
             logger.error(f"Error in update_entities: {str(e)}")
 
     def retrieve_relevant_chunks(self, query: str, k: int = 3) -> RetrievalResult:
-        if not self.documents:
+        snapshot = self.knowledge.snapshot()
+        if not len(snapshot):
             return RetrievalResult.empty()
             
         query_embedding = self.encoder.encode([query])[0]
-        similarities = cosine_similarity([query_embedding], self.embeddings)[0]
-        
-        top_k_indices = np.argsort(similarities)[-k:][::-1]
+        return self._search_snapshot(snapshot, query_embedding, k)
+
+    async def aretrieve_relevant_chunks(self, query: str, k: int = 3) -> RetrievalResult:
+        """Async retrieval; the query is encoded in a micro-batch shared with other calls."""
+        snapshot = self.knowledge.snapshot()
+        if not len(snapshot):
+            return RetrievalResult.empty()
+
+        query_embedding = await query_embedder.embed(query)
+        return self._search_snapshot(snapshot, query_embedding, k)
+
+    def _search_snapshot(self, snapshot, query_embedding, k: int) -> RetrievalResult:
+        top_k_indices, similarities = snapshot.search(query_embedding, k)
         
         result = RetrievalResult()
-        result.chunks = [self.documents[i] for i in top_k_indices]
-        result.similarities = [float(similarities[i]) for i in top_k_indices]
-        result.sources = [self.sources[i] for i in top_k_indices]
-        result.page_numbers = [self.page_numbers[i] for i in top_k_indices]
+        result.chunks = [snapshot.documents[i] for i in top_k_indices]
+        result.similarities = [float(similarity) for similarity in similarities]
+        result.sources = [snapshot.sources[i] for i in top_k_indices]
+        result.page_numbers = [snapshot.page_numbers[i] for i in top_k_indices]
         
         return result
 
@@ -348,14 +629,12 @@ class AI_SalesAgent:
 
 
             # Get summary from OpenAI
-            response = await asyncio.get_event_loop().run_in_executor(
-                executor,
-                lambda: self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo-1106",
-                    messages=summary_prompt,
-                    temperature=0.1,
-                    max_tokens=200
-                )
+            response = await self.llm.chat_completion(
+                model="gpt-3.5-turbo-1106",
+                messages=summary_prompt,
+                temperature=0.1,
+                max_tokens=200,
+                purpose="summary"
             )
 
             print("END>>>>>>>>>>",response.choices[0].message.content)
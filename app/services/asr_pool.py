@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_model = None  # Per worker process, loaded once by the pool initializer
+
+
+def _init_worker(model_name: str, threads: int):
+    global _model
+    import torch
+    import whisper
+    torch.set_num_threads(threads)
+    _model = whisper.load_model(model_name)
+
+
+def _ping() -> bool:
+    return _model is not None
+
+
+def _transcribe(pcm: bytes) -> tuple[str, float]:
+    # The buffer is reinterpreted in place; float32 bytes pickle as a single copy
+    audio = np.frombuffer(pcm, dtype=np.float32)
+    started = time.perf_counter()
+    text = _model.transcribe(audio, fp16=False)["text"]
+    return text.strip(), time.perf_counter() - started
+
+
+class ASRPool:
+    """Whisper transcription in dedicated worker processes, each with the model loaded once.
+
+    Keeps long transcriptions off the web process's GIL and thread pool. Audio is
+    handed over as raw float32 bytes, and the pool tracks queue depth and per-job
+    latency.
+    """
+
+    def __init__(self, workers: int, model_name: str, threads_per_worker: int):
+        self.workers = workers
+        self.model_name = model_name
+        self.threads_per_worker = threads_per_worker
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.jobs = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_transcribe_time = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: forking after torch has started its threads can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.threads_per_worker)
+                )
+            return self._executor
+
+    async def warmup(self):
+        """Start every worker and wait until each has loaded the model."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _ping) for _ in range(self.workers)))
+        logger.info(f"ASR pool ready with {self.workers} workers ({self.model_name})")
+
+    async def transcribe(self, samples: np.ndarray) -> str:
+        """Transcribe 16 kHz float32 mono samples."""
+        pcm = np.ascontiguousarray(samples, dtype=np.float32).tobytes()
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            text, transcribe_time = await asyncio.get_running_loop().run_in_executor(self.executor, _transcribe, pcm)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        latency = time.perf_counter() - started
+        self.jobs += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_transcribe_time += transcribe_time
+        return text
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "jobs": self.jobs,
+            "failures": self.failures,
+            "avg_latency_ms": 1000 * self.total_latency / self.jobs if self.jobs else 0.0,
+            "max_latency_ms": 1000 * self.max_latency,
+            "avg_transcribe_ms": 1000 * self.total_transcribe_time / self.jobs if self.jobs else 0.0
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+asr_pool = ASRPool(settings.ASR_WORKERS, settings.WHISPER_MODEL, settings.ASR_THREADS_PER_WORKER)
@@ -0,0 +1,134 @@
+import io
+import wave
+import numpy as np
+from .vad import UtteranceSegmenter
+from ..config import settings
+
+INPUT_RATE = 8000  # Twilio media streams are 8 kHz μ-law
+OUTPUT_RATE = 16000  # Whisper expects 16 kHz float PCM
+
+
+def _build_mulaw_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.uint8)
+    exponent = (u >> 4) & 0x07
+    mantissa = (u & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return (np.where(u & 0x80, -magnitude, magnitude) / 32768.0).astype(np.float32)
+
+
+def _build_mulaw_encode_table() -> np.ndarray:
+    # Same 14-bit G.711 reference algorithm as the stdlib's audioop.lin2ulaw
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), 8159) + 0x21
+    segment = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), magnitude)
+    codes = np.where(segment >= 8, 0x7F, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)) ^ mask
+    # Index by the int16 sample's bit pattern read as uint16
+    return np.roll(codes.astype(np.uint8), -32768)
+
+
+MULAW_TABLE = _build_mulaw_table()  # G.711 μ-law byte -> float32 sample in [-1, 1]
+MULAW_ENCODE_TABLE = _build_mulaw_encode_table()  # int16 sample (as uint16) -> μ-law byte
+
+
+def wav_to_mulaw(wav_bytes: bytes) -> bytes:
+    """Convert 16-bit mono WAV audio into 8 kHz μ-law bytes for a Twilio media stream."""
+    with wave.open(io.BytesIO(wav_bytes)) as wav:
+        rate = wav.getframerate()
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if wav.getnchannels() > 1:
+            pcm = pcm[::wav.getnchannels()]
+    if rate != INPUT_RATE and len(pcm):
+        positions = np.arange(0, len(pcm), rate / INPUT_RATE)
+        pcm = np.interp(positions, np.arange(len(pcm)), pcm).astype(np.int16)
+    return MULAW_ENCODE_TABLE[pcm.view(np.uint16)].tobytes()
+
+
+class AudioRingBuffer:
+    """Fixed-size float32 ring addressed by absolute sample position.
+
+    Memory is allocated once per call; only ``read`` copies, and only when an
+    utterance or partial is handed to ASR.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.end = 0  # Absolute position one past the newest sample
+
+    def writable(self, count: int):
+        """View of the next ``count`` slots if they do not wrap, else None."""
+        offset = self.end % self.capacity
+        if offset + count <= self.capacity:
+            return self.buffer[offset:offset + count]
+        return None
+
+    def write(self, samples: np.ndarray):
+        offset = self.end % self.capacity
+        head = min(len(samples), self.capacity - offset)
+        self.buffer[offset:offset + head] = samples[:head]
+        self.buffer[:len(samples) - head] = samples[head:]
+
+    def commit(self, count: int):
+        self.end += count
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        start = max(start, self.end - self.capacity)
+        first, last = start % self.capacity, end % self.capacity
+        if end - start <= 0:
+            return np.zeros(0, dtype=np.float32)
+        if first < last or last == 0:
+            return self.buffer[first:last or self.capacity].copy()
+        return np.concatenate([self.buffer[first:], self.buffer[:last]])
+
+
+class CallAudioFrontend:
+    """Per-call μ-law decode, 8 kHz -> 16 kHz resampling and utterance segmentation.
+
+    Each frame is decoded through a 256-entry lookup table and linearly upsampled in
+    one vectorized block straight into the call's ring buffer, using scratch arrays
+    allocated once, so steady-state frames cause no array allocations. ``push``
+    returns segmenter events with the 16 kHz audio for partials and utterances.
+    """
+
+    def __init__(self, segmenter: UtteranceSegmenter = None, max_frame: int = 1600, partials: bool = True):
+        self.segmenter = segmenter or UtteranceSegmenter(
+            sample_rate=OUTPUT_RATE, partial_interval_ms=settings.VAD_PARTIAL_INTERVAL_MS if partials else 0
+        )
+        # Room for the longest utterance plus pre-roll and a few seconds of slack
+        seconds = settings.VAD_MAX_UTTERANCE_MS / 1000 + 5
+        self.ring = AudioRingBuffer(int(seconds * OUTPUT_RATE))
+        self.max_frame = max_frame
+        self._decoded = np.zeros(max_frame, dtype=np.float32)
+        self._resampled = np.zeros(2 * max_frame, dtype=np.float32)
+        self._last = np.float32(0.0)
+
+    def _upsample(self, x: np.ndarray, out: np.ndarray):
+        # Odd outputs are the input samples; even outputs are midpoints with the previous sample
+        out[1::2] = x
+        out[0] = 0.5 * (self._last + x[0])
+        np.add(x[:-1], x[1:], out=out[2::2])
+        out[2::2] *= 0.5
+        self._last = x[-1]
+
+    def push(self, payload: bytes) -> list[tuple[str, np.ndarray]]:
+        codes = np.frombuffer(payload, dtype=np.uint8)
+        events = []
+        for block_start in range(0, len(codes), self.max_frame):
+            block = codes[block_start:block_start + self.max_frame]
+            decoded = self._decoded[:len(block)]
+            np.take(MULAW_TABLE, block, out=decoded)
+
+            count = 2 * len(block)
+            target = self.ring.writable(count)
+            if target is None:
+                target = self._resampled[:count]
+                self._upsample(decoded, target)
+                self.ring.write(target)
+            else:
+                self._upsample(decoded, target)
+            self.ring.commit(count)
+
+            for kind, start, end in self.segmenter.feed(target, self.ring.end):
+                events.append((kind, self.ring.read(start, end) if kind in ("partial", "utterance") else None))
+        return events
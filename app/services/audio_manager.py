@@ -1,24 +1,41 @@
 import asyncio
-from typing import Optional, Any
-import threading
+from typing import Optional
 
 class AudioStreamManager:
+    """Owns the agent's in-flight reply for one call so caller speech can cut it off.
+
+    ``start_response`` runs a reply (LLM stream plus any synthesis) as a task;
+    ``interrupt`` cancels it, which closes the OpenAI stream and drops pending synthesis.
+    The next turn then reads ``consume_interruption`` to know the previous reply
+    was cut short.
+    """
+
     def __init__(self):
-        self.current_stream: Optional[Any] = None
-        self.stream_lock = asyncio.Lock()
-        self.should_stop = threading.Event()
-    
-    async def start_new_stream(self, audio_data: bytes):
-        async with self.stream_lock:
-            if self.current_stream:
-                self.should_stop.set()
-                await asyncio.sleep(0.1)
-            
-            self.should_stop.clear()
-            self.current_stream = audio_data
-    
-    async def stop_current_stream(self):
-        async with self.stream_lock:
-            if self.current_stream:
-                self.should_stop.set()
-                self.current_stream = None
\ No newline at end of file
+        self.current_task: Optional[asyncio.Task] = None
+        self.interrupted = False
+        self.interruptions = 0
+
+    @property
+    def speaking(self) -> bool:
+        return self.current_task is not None and not self.current_task.done()
+
+    def start_response(self, coro) -> asyncio.Task:
+        if self.speaking:
+            self.current_task.cancel()
+        self.current_task = asyncio.create_task(coro)
+        return self.current_task
+
+    async def interrupt(self) -> bool:
+        """Cancel the reply in flight, if any, and wait for it to unwind."""
+        if not self.speaking:
+            return False
+        task = self.current_task
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self.interrupted = True
+        self.interruptions += 1
+        return True
+
+    def consume_interruption(self) -> bool:
+        interrupted, self.interrupted = self.interrupted, False
+        return interrupted
@@ -0,0 +1,129 @@
+import logging
+import threading
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from smallest import Smallest
+from twilio.rest import Client
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """Process-wide, lazily initialized holder for outbound API clients.
+
+    Every call borrows the same pooled keep-alive clients instead of building
+    its own, so credentials are refreshed and connections are reused in one place.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resource_locks = {}  # One lock per resource, so a slow model load never blocks client lookups
+        self._resources = {}
+        self._openai_warmup_claimed = False
+
+    def _lazy(self, name: str, factory):
+        resource = self._resources.get(name)
+        if resource is None:
+            with self._lock:
+                lock = self._resource_locks.setdefault(name, threading.Lock())
+            with lock:
+                resource = self._resources.get(name)
+                if resource is None:
+                    resource = factory()
+                    self._resources[name] = resource
+        return resource
+
+    def _http_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+
+    @property
+    def openai_client(self) -> OpenAI:
+        def create():
+            client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=httpx.Client(limits=self._http_limits())
+            )
+            logger.info("Shared OpenAI client initialized.")
+            return client
+        return self._lazy("openai_client", create)
+
+    @property
+    def async_openai_client(self) -> AsyncOpenAI:
+        def create():
+            client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=httpx.AsyncClient(limits=self._http_limits())
+            )
+            logger.info("Shared async OpenAI client initialized.")
+            return client
+        return self._lazy("async_openai_client", create)
+
+    @property
+    def llm(self):
+        from .llm_client import LLMClient
+        return self._lazy("llm", lambda: LLMClient(self))
+
+    @property
+    def smallest_client(self) -> Smallest:
+        return self._lazy("smallest_client", lambda: Smallest(api_key=settings.SMALLEST_API_KEY))
+
+    @property
+    def twilio_client(self) -> Client:
+        return self._lazy("twilio_client", lambda: Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN))
+
+    @property
+    def calendar_manager(self):
+        from .google_calendar_manager import GoogleCalendarManager
+        return self._lazy("calendar_manager", GoogleCalendarManager)
+
+    @property
+    def salesforce_integration(self):
+        from .salesforce_integration import SalesforceIntegration
+        return self._lazy("salesforce_integration", SalesforceIntegration)
+
+    @property
+    def encoder(self):
+        """Shared SentenceTransformer used for knowledge and query embeddings."""
+        def create():
+            from sentence_transformers import SentenceTransformer
+            encoder = SentenceTransformer(settings.EMBEDDING_MODEL)
+            logger.info(f"Shared encoder {settings.EMBEDDING_MODEL} loaded.")
+            return encoder
+        return self._lazy("encoder", create)
+
+    def claim_openai_warmup(self) -> bool:
+        """Return True exactly once per registry so only one caller runs the warmup request."""
+        with self._lock:
+            if self._openai_warmup_claimed:
+                return False
+            self._openai_warmup_claimed = True
+            return True
+
+    async def aclose(self):
+        """Release pooled connections, including the async client's."""
+        async_openai_client = self._resources.pop("async_openai_client", None)
+        if async_openai_client is not None:
+            try:
+                await async_openai_client.close()
+            except Exception as e:
+                logger.error(f"Error closing async OpenAI client: {str(e)}")
+        self.close()
+
+    def close(self):
+        """Release pooled connections held by the shared clients."""
+        openai_client = self._resources.pop("openai_client", None)
+        if openai_client is not None:
+            try:
+                openai_client.close()
+            except Exception as e:
+                logger.error(f"Error closing OpenAI client: {str(e)}")
+
+
+client_registry = ClientRegistry()
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+import numpy as np
+from ..config import settings
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; shards are then never merged
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Content-addressed, on-disk embedding store keyed by hash of model name and chunk text.
+
+    Embeddings live in append-only ``.npy`` shards opened with ``mmap_mode='r'``, so
+    every worker on the host shares the same page-cache pages. A shard's ``.keys``
+    file is written last and marks it complete; shards written by other workers are
+    picked up on the next lookup. Beyond ``max_shards`` shards, one worker at a time
+    merges them into a single shard, so file count and load time stay bounded.
+    """
+
+    def __init__(self, directory: str, model_name: str, max_shards: int = 16):
+        self.model_name = model_name
+        self.directory = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.max_shards = max_shards
+        self._lock = threading.Lock()
+        self._index = {}  # key -> (shard name, row)
+        self._shards = {}  # shard name -> memory-mapped array
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load_new_shards(self):
+        if not self.directory.exists():
+            return
+        keys_paths = sorted(self.directory.glob("*.keys"))
+        if not {keys_path.stem for keys_path in keys_paths}.issuperset(self._shards):
+            # Shards were merged away: index the merged shard instead (open mmaps stay valid meanwhile)
+            self._shards = {}
+            self._index = {}
+        for keys_path in keys_paths:
+            shard = keys_path.stem
+            if shard in self._shards:
+                continue
+            try:
+                self._shards[shard] = np.load(self.directory / f"{shard}.npy", mmap_mode="r")
+                keys = keys_path.read_text().split()
+            except FileNotFoundError:
+                continue  # Merged away by another worker since the glob
+            for row, key in enumerate(keys):
+                self._index.setdefault(key, (shard, row))
+        if len(keys_paths) > self.max_shards:
+            self._merge_shards()
+
+    def _merge_shards(self):
+        """Rewrite every complete shard as one, under a lock file so only one worker merges."""
+        if fcntl is None:
+            return
+        with open(self.directory / "merge.lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # Another worker is merging; its shard is picked up on a later lookup
+            try:
+                keys, vectors, merged = [], [], []
+                seen = set()
+                for keys_path in sorted(self.directory.glob("*.keys")):
+                    try:
+                        shard_vectors = np.load(self.directory / f"{keys_path.stem}.npy")
+                        shard_keys = keys_path.read_text().split()
+                    except FileNotFoundError:
+                        continue
+                    rows = [row for row, key in enumerate(shard_keys) if key not in seen]
+                    seen.update(shard_keys)
+                    keys.extend(shard_keys[row] for row in rows)
+                    vectors.append(shard_vectors[rows])
+                    merged.append(keys_path.stem)
+                if len(merged) < 2:
+                    return
+
+                self._write_shard(keys, np.concatenate(vectors))
+                # Keys first, so no worker finds a shard whose array is gone; open mmaps stay valid
+                for shard in merged:
+                    (self.directory / f"{shard}.keys").unlink(missing_ok=True)
+                    (self.directory / f"{shard}.npy").unlink(missing_ok=True)
+                logger.info(f"Embedding cache: merged {len(merged)} shards ({len(keys)} embeddings)")
+            except Exception as e:
+                logger.error(f"Error merging embedding cache shards: {str(e)}")
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_shard(self, keys: List[str], vectors: np.ndarray):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        shard = f"{time.time_ns()}_{os.getpid()}"
+        tmp_array = self.directory / f"{shard}.npy.tmp"
+        tmp_keys = self.directory / f"{shard}.keys.tmp"
+        with open(tmp_array, "wb") as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+        tmp_keys.write_text("\n".join(keys))
+        os.replace(tmp_array, self.directory / f"{shard}.npy")
+        os.replace(tmp_keys, self.directory / f"{shard}.keys")
+        self._shards[shard] = np.load(self.directory / f"{shard}.npy", mmap_mode="r")
+        for row, key in enumerate(keys):
+            self._index.setdefault(key, (shard, row))
+
+    def get_or_encode(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for texts, calling ``encode`` only for chunks not seen before."""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            self._load_new_shards()
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._index and key not in missing:
+                    missing[key] = text
+
+        vectors = None
+        if missing:
+            # Model inference runs unlocked so concurrent ingests encode in parallel
+            logger.info(f"Embedding cache: encoding {len(missing)} of {len(texts)} chunks")
+            vectors = np.asarray(encode(list(missing.values())), dtype=np.float32)
+
+        with self._lock:
+            if vectors is not None:
+                self._write_shard(list(missing.keys()), vectors)
+            if not texts:
+                return np.zeros((0, 0), dtype=np.float32)
+            first_shard, _ = self._index[keys[0]]
+            result = np.empty((len(texts), self._shards[first_shard].shape[1]), dtype=np.float32)
+            for i, key in enumerate(keys):
+                shard, row = self._index[key]
+                result[i] = self._shards[shard][row]
+            return result
+
+
+embedding_cache = EmbeddingCache(
+    settings.EMBEDDING_CACHE_DIR, settings.EMBEDDING_MODEL, settings.EMBEDDING_CACHE_MAX_SHARDS
+)
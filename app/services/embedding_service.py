@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+import numpy as np
+from ..config import settings
+from .client_registry import client_registry
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Micro-batch concurrent query encodes across calls.
+
+    Requests arriving within ``max_wait_ms`` of each other (or until ``max_batch_size``
+    is reached) are encoded in one ``encode`` call on a dedicated thread, and each
+    caller's future is resolved with its own row. While a batch is running, new
+    requests accumulate and go out as the next batch the moment it finishes.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int, max_wait_ms: float):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-batcher")
+        self._pending = []  # (text, future, enqueued_at)
+        self._flush_handle = None
+        self._running = False
+        self.batches = 0
+        self.items = 0
+        self.max_observed_batch = 0
+        self.total_queue_time = 0.0
+        self.total_encode_time = 0.0
+
+    async def embed(self, text: str) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, loop.time()))
+        if self._running:
+            pass  # Flushed as soon as the running batch finishes
+        elif len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._running or not self._pending:
+            return
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        self._running = True
+        asyncio.get_running_loop().create_task(self._run(batch))
+
+    def _encode_timed(self, texts: List[str]):
+        # The loop clock is time.monotonic, so these timestamps compare with enqueued_at
+        started = time.monotonic()
+        vectors = self.encode(texts)
+        return vectors, started, time.monotonic()
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.items += len(batch)
+        self.max_observed_batch = max(self.max_observed_batch, len(batch))
+        try:
+            vectors, started, finished = await loop.run_in_executor(
+                self.executor, self._encode_timed, [text for text, _, _ in batch]
+            )
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(batch)} queries: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._running = False
+            self._flush()
+        # Queue time covers both the gathering window and any wait for the encoder thread
+        self.total_queue_time += sum(started - enqueued_at for _, _, enqueued_at in batch)
+        self.total_encode_time += finished - started
+        for row, (_, future, _) in enumerate(batch):
+            if not future.done():
+                future.set_result(vectors[row])
+
+    def metrics(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.items,
+            "pending": len(self._pending),
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_observed_batch,
+            "avg_queue_time_ms": 1000 * self.total_queue_time / self.items if self.items else 0.0,
+            "avg_encode_time_ms": 1000 * self.total_encode_time / self.batches if self.batches else 0.0
+        }
+
+
+query_embedder = EmbeddingBatcher(
+    lambda texts: client_registry.encoder.encode(texts),
+    settings.EMBEDDING_BATCH_MAX_SIZE,
+    settings.EMBEDDING_BATCH_MAX_WAIT_MS
+)
@@ -0,0 +1,98 @@
+import json
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ENTITIES_START = "[[ENTITIES]]"
+ENTITIES_END = "[[END_ENTITIES]]"
+
+
+def parse_entities_block(entities_text: str) -> Optional[dict]:
+    """Parse the JSON between the entity sentinels into {"entities": {...}}."""
+    entities_text = (entities_text or "").strip()
+    if not entities_text:
+        return None
+
+    try:
+        entities = json.loads(entities_text)
+    except json.JSONDecodeError:
+        # Fall back to the single-quoted variant the model sometimes produces
+        try:
+            entities = json.loads(entities_text.replace("'", '"'))
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON parsing error: {str(e)}, Raw text: {entities_text}")
+            return None
+
+    # Ensure proper structure
+    if not isinstance(entities, dict):
+        return {"entities": {}}
+    if "entities" not in entities:
+        return {"entities": entities}
+    return entities
+
+
+class EntityStreamParser:
+    """Incrementally split a streamed response into speech and its [[ENTITIES]] block.
+
+    ``feed`` returns only text that is safe to speak: a trailing fragment that could
+    be the start of the sentinel is held back until the next delta decides it.
+    """
+
+    def __init__(self):
+        self.speech_parts = []
+        self.entities_parts = []
+        self.pending = ""
+        self.in_entities = False
+        self.finished = False
+
+    def feed(self, delta: str) -> str:
+        if self.finished:
+            return ""
+
+        if self.in_entities:
+            self.entities_parts.append(delta)
+            self._check_end()
+            return ""
+
+        text = self.pending + delta
+        self.pending = ""
+        start = text.find(ENTITIES_START)
+        if start != -1:
+            self.in_entities = True
+            self.entities_parts.append(text[start + len(ENTITIES_START):])
+            self._check_end()
+            return self._speak(text[:start])
+
+        # Hold back the longest suffix that is still a prefix of the sentinel
+        for size in range(min(len(ENTITIES_START) - 1, len(text)), 0, -1):
+            if ENTITIES_START.startswith(text[-size:]):
+                self.pending = text[-size:]
+                text = text[:-size]
+                break
+        return self._speak(text)
+
+    def close(self) -> str:
+        """Release any held-back text once the stream has ended."""
+        pending, self.pending = self.pending, ""
+        return self._speak(pending)
+
+    def _speak(self, text: str) -> str:
+        if text:
+            self.speech_parts.append(text)
+        return text
+
+    def _check_end(self):
+        entities_text = "".join(self.entities_parts)
+        end = entities_text.find(ENTITIES_END)
+        if end != -1:
+            self.entities_parts = [entities_text[:end]]
+            self.finished = True
+
+    @property
+    def spoken_text(self) -> str:
+        return "".join(self.speech_parts).strip()
+
+    @property
+    def entities_text(self) -> str:
+        return "".join(self.entities_parts).strip()
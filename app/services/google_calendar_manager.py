@@ -3,6 +3,7 @@ from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 import os
 import pickle
+import threading
 from datetime import datetime, timedelta
 from ..config import settings
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -10,6 +11,8 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 class GoogleCalendarManager:
     def __init__(self):
         self.creds = None
+        self.service = None
+        self._refresh_lock = threading.Lock()
         self.initialize_credentials()
 
     def initialize_credentials(self):
@@ -21,19 +24,32 @@ class GoogleCalendarManager:
             },
             settings.SCOPES
         )
+        self.ensure_valid_credentials()
 
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
+    def ensure_valid_credentials(self):
+        """Refresh the access token only when it is missing or expired."""
+        with self._refresh_lock:
+            if self.creds and self.creds.valid:
+                return self.creds
+            if self.creds and self.creds.refresh_token:
                 self.creds.refresh(Request())
-            else:
-                raise Exception("Invalid credentials or refresh token.")
+                self.service = None
+                return self.creds
+            raise Exception("Invalid credentials or refresh token.")
+
+    def get_service(self):
+        """Return the Calendar API service, rebuilding it only after a token refresh."""
+        self.ensure_valid_credentials()
+        if self.service is None:
+            self.service = build('calendar', 'v3', credentials=self.creds, cache_discovery=False)
+        return self.service
 
     async def create_calendar_event(self, entities):
         try:
             if not entities.get('meeting_date') or not entities.get('meeting_time'):
                 return {"success": False, "error": "Missing meeting date or time"}
 
-            service = build('calendar', 'v3', credentials=self.creds)
+            service = self.get_service()
             date_str = entities['meeting_date']
             time_str = entities['meeting_time']
 
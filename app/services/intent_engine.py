@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import re
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Optional
+import numpy as np
+from ..config import settings
+from ..utils.constants import END_CALL_PHRASES, AFFIRM_PHRASES, DENY_PHRASES, INTENT_EXAMPLES
+from .embedding_service import query_embedder
+
+logger = logging.getLogger(__name__)
+
+
+def compile_phrases(phrases: list[str]) -> re.Pattern:
+    """One case-insensitive alternation matching whole words only, longest phrase first."""
+    alternatives = sorted({phrase.lower() for phrase in phrases}, key=len, reverse=True)
+    return re.compile(r"(?<!\w)(?:" + "|".join(re.escape(phrase) for phrase in alternatives) + r")(?!\w)", re.IGNORECASE)
+
+
+END_CALL_PATTERN = compile_phrases(END_CALL_PHRASES)
+AFFIRM_PATTERN = compile_phrases(AFFIRM_PHRASES)
+DENY_PATTERN = compile_phrases(DENY_PHRASES)
+# Longest turn without a closing phrase that is still checked against the end-call examples
+END_CALL_MAX_WORDS = 6
+# "not sure", "not right now", "I don't think so": never a plain yes, whatever else was said
+NEGATION_PATTERN = re.compile(r"(?<!\w)(?:not|no|never)(?!\w)|n't(?!\w)", re.IGNORECASE)
+
+EMAIL_PATTERN = re.compile(r"[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}", re.IGNORECASE)
+SPOKEN_EMAIL_SYMBOLS = [
+    (re.compile(r"\bat the rate(?: of)?\b|\bat sign\b|\bat\b"), " @ "),
+    (re.compile(r"\bdot\b|\bpoint\b"), " . "),
+    (re.compile(r"\bunderscore\b"), " _ "),
+    (re.compile(r"\b(?:dash|hyphen)\b"), " - ")
+]
+EMAIL_FILLER = {
+    "my", "email", "e-mail", "mail", "id", "address", "is", "it's", "its", "it", "the", "sure",
+    "yes", "yeah", "ok", "okay", "so", "that's", "thats", "you", "can", "note", "please", "and"
+}
+
+MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",),
+        ("june", "jun"), ("july", "jul"), ("august", "aug"), ("september", "sept", "sep"),
+        ("october", "oct"), ("november", "nov"), ("december", "dec")
+    ], 1)
+    for name in names
+}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_UNIT_ORDINALS = ["first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth"]
+ORDINAL_WORDS = {
+    **{word: day for day, word in enumerate(_UNIT_ORDINALS, 1)},
+    **{word: day for day, word in enumerate([
+        "tenth", "eleventh", "twelfth", "thirteenth", "fourteenth", "fifteenth",
+        "sixteenth", "seventeenth", "eighteenth", "nineteenth", "twentieth"
+    ], 10)},
+    **{f"twenty {word}": 20 + day for day, word in enumerate(_UNIT_ORDINALS, 1)},
+    "thirtieth": 30,
+    "thirty first": 31
+}
+HOUR_WORDS = {
+    word: hour for hour, word in enumerate(
+        ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven", "twelve"], 1
+    )
+}
+MINUTE_WORDS = {"o'clock": 0, "fifteen": 15, "thirty": 30, "forty five": 45}
+
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?|(?P<day_word>" + "|".join(
+    sorted(ORDINAL_WORDS, key=len, reverse=True)
+) + ")"
+_MONTH = r"(?P<month>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+DATE_PATTERNS = [
+    re.compile(rf"(?<!\w)(?:the\s+)?(?:{_DAY})\s+(?:of\s+)?{_MONTH}(?!\w)"),
+    re.compile(rf"(?<!\w){_MONTH}\s+(?:the\s+)?(?:{_DAY})(?!\w)"),
+    re.compile(r"(?<!\d)(?P<day>\d{1,2})[/-](?P<month_number>\d{1,2})[/-](?P<year>\d{4})(?!\d)")
+]
+RELATIVE_DATE_PATTERN = re.compile(r"(?<!\w)(day after tomorrow|tomorrow|today)(?!\w)")
+WEEKDAY_PATTERN = re.compile(r"(?<!\w)(?:(?:next|this|coming)\s+)?(" + "|".join(WEEKDAYS) + r")(?!\w)")
+TIME_PATTERN = re.compile(
+    r"(?<!\w)(?P<hour>\d{1,2}|" + "|".join(HOUR_WORDS) + r")"
+    r"(?:[:.](?P<minute>\d{2})|\s+(?P<minute_word>" + "|".join(MINUTE_WORDS) + r"))?"
+    r"\s*(?P<meridiem>a\.?\s?m\.?|p\.?\s?m\.?)(?!\w)"
+)
+NOON_PATTERN = re.compile(r"(?<!\w)(?:12\s+)?noon(?!\w)")
+# A turn about setting up the meeting; "today" or "Monday" elsewhere is small talk
+SCHEDULING_PATTERN = re.compile(
+    r"(?<!\w)(?:meet|meeting|schedule|book|demo|appointment|calendar|call back|available|free|slot|works for me)(?!\w)",
+    re.IGNORECASE
+)
+
+
+def spoken_email(text: str) -> tuple[Optional[str], list[str]]:
+    """Return (email, leftover words) for an email typed out or spelled in speech.
+
+    Handles "john at the rate gmail dot com", "john dot smith at gmail dot com" and
+    letters spelled one by one ("j o h n at gmail dot com").
+    """
+    lowered = text.lower().strip().rstrip(".!?")
+    match = EMAIL_PATTERN.search(lowered)
+    if match:
+        return match.group(0), (lowered[:match.start()] + " " + lowered[match.end():]).split()
+    if not re.search(r"\b(?:dot|point)\b|\w\.\w", lowered):
+        return None, lowered.split()
+
+    spoken = re.sub(r"[,!?]", " ", lowered)
+    for pattern, symbol in SPOKEN_EMAIL_SYMBOLS:
+        spoken = pattern.sub(symbol, spoken)
+    tokens = spoken.split()
+    if "@" not in tokens:
+        return None, lowered.split()
+    at = tokens.index("@")
+    if at == 0 or at + 1 >= len(tokens):
+        return None, lowered.split()
+
+    # Local part: words joined by . _ - and runs of single spelled-out characters
+    start = at - 1
+    while start > 0:
+        previous = tokens[start - 1]
+        if previous in (".", "_", "-") and start >= 2:
+            start -= 2
+        elif len(previous) == 1 and previous.isalnum() and len(tokens[start]) == 1:
+            start -= 1
+        else:
+            break
+
+    end = at + 2
+    while end + 1 < len(tokens) and tokens[end] in (".", "-") and re.fullmatch(r"[a-z0-9-]+", tokens[end + 1]):
+        end += 2
+
+    email = "".join(tokens[start:at]) + "@" + "".join(tokens[at + 1:end])
+    if not EMAIL_PATTERN.fullmatch(email):
+        return None, lowered.split()
+    return email, tokens[:start] + tokens[end:]
+
+
+def spoken_date(text: str, today: date = None, relative: bool = True) -> Optional[str]:
+    """Resolve a spoken meeting date ("25th of March", "next Monday", "tomorrow") to DD-MM-YYYY.
+
+    With ``relative=False`` only explicit calendar dates count, not "tomorrow" or a weekday.
+    """
+    today = today or date.today()
+    lowered = text.lower().replace("-", " ")
+    for pattern in DATE_PATTERNS[:2]:
+        match = pattern.search(lowered)
+        if match:
+            day = int(match.group("day")) if match.group("day") else ORDINAL_WORDS[match.group("day_word")]
+            try:
+                resolved = date(today.year, MONTHS[match.group("month")], day)
+            except ValueError:
+                return None
+            if resolved < today:
+                resolved = resolved.replace(year=today.year + 1)
+            return resolved.strftime("%d-%m-%Y")
+    numeric = DATE_PATTERNS[2].search(text)
+    if numeric:
+        try:
+            resolved = date(int(numeric.group("year")), int(numeric.group("month_number")), int(numeric.group("day")))
+        except ValueError:
+            return None
+        return resolved.strftime("%d-%m-%Y")
+    if not relative:
+        return None
+
+    match = RELATIVE_DATE_PATTERN.search(lowered)
+    if match:
+        offset = {"today": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group(1)]
+        return (today + timedelta(days=offset)).strftime("%d-%m-%Y")
+
+    match = WEEKDAY_PATTERN.search(lowered)
+    if match:
+        days_ahead = (WEEKDAYS.index(match.group(1)) - today.weekday()) % 7 or 7
+        return (today + timedelta(days=days_ahead)).strftime("%d-%m-%Y")
+    return None
+
+
+def spoken_time(text: str) -> Optional[str]:
+    """Resolve a spoken meeting time ("3 pm", "three thirty p.m.", "noon") to 24-hour HH:MM."""
+    lowered = text.lower().replace("-", " ")
+    if NOON_PATTERN.search(lowered):
+        return "12:00"
+    match = TIME_PATTERN.search(lowered)
+    if not match:
+        return None
+    hour = HOUR_WORDS.get(match.group("hour")) or int(match.group("hour"))
+    if match.group("minute"):
+        minute = int(match.group("minute"))
+    else:
+        minute = MINUTE_WORDS.get(match.group("minute_word"), 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    hour = hour % 12 + (12 if match.group("meridiem").startswith("p") else 0)
+    return f"{hour:02d}:{minute:02d}"
+
+
+class IntentEngine:
+    """Local intent and slot recognition for turns that do not need the LLM.
+
+    Compiled word-boundary phrase lists give a fast first answer; when they are
+    missing or ambiguous, the utterance is matched against labelled examples with
+    the shared MiniLM encoder (cosine nearest neighbour, batched with other calls).
+    Counts every turn the agent answered without an LLM request.
+    """
+
+    def __init__(self, embed: Callable[[str], Awaitable[np.ndarray]], threshold: float):
+        self.embed = embed
+        self.threshold = threshold
+        self._examples = None  # (normalized example matrix, labels)
+        self._prepare_lock = None
+        self.turns = 0
+        self.classifications = 0
+        self.avoided = {}
+        self.slots_filled = {}
+
+    async def warmup(self):
+        """Encode the labelled examples once; the first classification does this on demand."""
+        if self._prepare_lock is None:
+            self._prepare_lock = asyncio.Lock()
+        async with self._prepare_lock:
+            if self._examples is not None:
+                return
+            texts = [text for examples in INTENT_EXAMPLES.values() for text in examples]
+            labels = [label for label, examples in INTENT_EXAMPLES.items() for _ in examples]
+            matrix = np.stack(await asyncio.gather(*(self.embed(text) for text in texts))).astype(np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            self._examples = (matrix, np.array(labels))
+
+    async def classify(self, text: str) -> tuple[Optional[str], float]:
+        """Nearest labelled example's intent and similarity, or (None, score) below the threshold."""
+        try:
+            if self._examples is None:
+                await self.warmup()
+            matrix, labels = self._examples
+            vector = np.asarray(await self.embed(text), dtype=np.float32)
+            similarities = matrix @ (vector / (np.linalg.norm(vector) + 1e-12))
+            best = int(np.argmax(similarities))
+            self.classifications += 1
+            score = float(similarities[best])
+            if score < self.threshold or labels[best] == "other":
+                return None, score
+            return str(labels[best]), score
+        except Exception as e:
+            logger.error(f"Error classifying intent: {str(e)}")
+            return None, 0.0
+
+    async def is_end_call(self, text: str) -> bool:
+        """Whether the caller is wrapping up; only closing cues or short turns reach the encoder."""
+        match = END_CALL_PATTERN.search(text)
+        # "bye" or "okay, thank you bye" ends the call; "thank you, tell me more" does not
+        if match and len(text.split()) <= len(match.group(0).split()) + 2:
+            return True
+        if not match and len(text.split()) > END_CALL_MAX_WORDS:
+            return False  # A long turn with no closing phrase is the conversation going on
+        intent, _ = await self.classify(text)
+        if intent is None and self._examples is None:
+            return bool(match)  # Encoder unavailable: fall back to the phrase list
+        return intent == "end_call"
+
+    async def confirmation(self, text: str) -> Optional[str]:
+        """Answer to a yes/no question: "affirm", "deny", or None when unclear.
+
+        Only an utterance made up entirely of affirm phrases ("yes", "sure, go ahead")
+        is a yes without the classifier. A negated answer ("I'm not sure") is a no
+        unless the caller also says goodbye ("not interested, bye").
+        """
+        words = re.sub(r"[^\w\s']", " ", text)
+        if AFFIRM_PATTERN.search(words) and not AFFIRM_PATTERN.sub(" ", words).split():
+            return "affirm"
+        if DENY_PATTERN.search(text):
+            return "deny"
+        negated = bool(NEGATION_PATTERN.search(text))
+        intent, _ = await self.classify(text)
+        if intent == "end_call" and (not negated or END_CALL_PATTERN.search(text)):
+            return "affirm"  # "bye" answers "would you like to end our conversation?"
+        if negated:
+            return "deny"
+        return intent if intent in ("affirm", "deny") else None
+
+    def extract_slots(self, text: str, today: date = None, scheduling: bool = False) -> dict:
+        """Email, meeting date and meeting time said in the utterance, normalized.
+
+        "Tomorrow" or a weekday is a meeting date only when the turn is about scheduling
+        or ``scheduling`` says the agent has just offered meeting times.
+        """
+        slots = {}
+        email, _ = spoken_email(text)
+        if email:
+            slots["email"] = email
+        meeting_date = spoken_date(text, today, relative=scheduling or bool(SCHEDULING_PATTERN.search(text)))
+        if meeting_date:
+            slots["meeting_date"] = meeting_date
+        meeting_time = spoken_time(text)
+        if meeting_time:
+            slots["meeting_time"] = meeting_time
+        for slot in slots:
+            self.slots_filled[slot] = self.slots_filled.get(slot, 0) + 1
+        return slots
+
+    def record_turn(self):
+        self.turns += 1
+
+    def record_avoided(self, intent: str):
+        """Count a turn answered locally instead of with an LLM request."""
+        self.avoided[intent] = self.avoided.get(intent, 0) + 1
+
+    def metrics(self) -> dict:
+        avoided = sum(self.avoided.values())
+        return {
+            "turns": self.turns,
+            "llm_calls_avoided": avoided,
+            "avoided_rate": avoided / self.turns if self.turns else 0.0,
+            "avoided_by_intent": dict(self.avoided),
+            "classifications": self.classifications,
+            "slots_filled": dict(self.slots_filled)
+        }
+
+
+intent_engine = IntentEngine(query_embedder.embed, settings.INTENT_SIMILARITY_THRESHOLD)
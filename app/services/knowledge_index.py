@@ -0,0 +1,302 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field, replace
+from typing import Dict, List
+import numpy as np
+from .vector_index import VectorIndex, build_vector_index, normalize, top_k
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+NEVER_REMOVED = np.iinfo(np.int64).max
+
+
+def _stack(*arrays) -> np.ndarray:
+    arrays = [array for array in arrays if len(array)]
+    return np.concatenate(arrays) if arrays else np.zeros((0, 0), dtype=np.float32)
+
+
+def _reserve(array: np.ndarray, rows: int, fill) -> np.ndarray:
+    """Return ``array``, or a copy with capacity doubled, so that it holds at least ``rows`` rows."""
+    if len(array) >= rows:
+        return array
+    grown = np.full((max(rows, 2 * len(array)),) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    """One immutable version of the knowledge base.
+
+    Rows ``[0, len(index))`` live in the main index, which is rebuilt only on
+    compaction; rows added since then live in the exact ``tail`` index. Removed or
+    replaced documents are tombstoned until the next compaction.
+
+    Snapshots between two compactions share append-only row storage and each reads
+    only its first ``size`` rows, so an add costs only the added chunks. A row is
+    tombstoned by stamping the version that removed it in ``removed_at``, so older
+    snapshots still see it.
+    """
+    version: int = 0
+    documents: List[str] = field(default_factory=list)
+    index: VectorIndex = field(default_factory=lambda: VectorIndex([]))
+    sources: List[str] = field(default_factory=list)
+    page_numbers: List[int] = field(default_factory=list)
+    tail: VectorIndex = field(default_factory=lambda: VectorIndex([]))
+    removed_at: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    rows: Dict[str, np.ndarray] = field(default_factory=dict)  # doc id -> its live rows
+    tombstones: int = 0
+    size: int = 0
+    tail_buffer: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+
+    def __len__(self) -> int:
+        return self.size - self.tombstones
+
+    def live(self) -> np.ndarray:
+        return self.removed_at[:self.size] > self.version
+
+    def search(self, query, k: int = 3) -> tuple[np.ndarray, np.ndarray]:
+        """Return (rows, similarities) of the k nearest live chunks, best first."""
+        base = len(self.index)
+        mask = self.live() if self.tombstones else None
+        indices, scores = self.index.search(query, k, None if mask is None else mask[:base])
+        if len(self.tail):
+            tail_indices, tail_scores = self.tail.search(query, k, None if mask is None else mask[base:])
+            indices = np.concatenate([indices, tail_indices + base])
+            scores = np.concatenate([scores, tail_scores])
+            best = top_k(scores, k)
+            indices, scores = indices[best], scores[best]
+        return indices, scores
+
+
+class KnowledgeIndex:
+    """Process-wide, multi-document knowledge base shared read-only by every agent.
+
+    Documents are keyed by ID. Adding or replacing a document encodes and indexes only
+    its chunks, and removing one tombstones its rows; ``compact`` later folds the tail
+    into the main index and drops tombstoned rows. Every change swaps in a new snapshot
+    atomically, so agents pick it up on their next retrieval.
+    """
+
+    def __init__(self, manifest_path: str = None):
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._snapshot = KnowledgeSnapshot()
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> KnowledgeSnapshot:
+        return self._snapshot
+
+    def list_documents(self) -> List[dict]:
+        snapshot = self._snapshot
+        return [
+            {"doc_id": doc_id, "source": snapshot.sources[rows[0]], "chunks": len(rows)}
+            for doc_id, rows in snapshot.rows.items()
+            if len(rows)
+        ]
+
+    def add_document(self, doc_id: str, documents: List[str], embeddings, source: str, page_numbers: List[int]) -> int:
+        """Add a document, replacing any earlier version with the same ID; returns the new version."""
+        added = normalize(embeddings) if len(documents) else None
+        with self._lock:
+            current = self._snapshot
+            version = current.version + 1
+            start = current.size
+            removed_at = _reserve(current.removed_at, start + len(documents), NEVER_REMOVED)
+            tombstones = current.tombstones
+            if doc_id in current.rows:
+                removed_at[current.rows[doc_id]] = version
+                tombstones += len(current.rows[doc_id])
+            removed_at[start:start + len(documents)] = NEVER_REMOVED
+
+            tail_start = start - len(current.index)
+            tail_buffer = current.tail_buffer
+            if added is not None:
+                if tail_buffer.shape[1:] != added.shape[1:]:
+                    tail_buffer = np.zeros((0, added.shape[1]), dtype=np.float32)
+                tail_buffer = _reserve(tail_buffer, tail_start + len(added), 0.0)
+                tail_buffer[tail_start:tail_start + len(added)] = added
+            tail_size = tail_start + (len(added) if added is not None else 0)
+
+            # Rows past an older snapshot's size are invisible to it; drop any left by a failed add
+            for column, values in (
+                (current.documents, documents),
+                (current.sources, [source] * len(documents)),
+                (current.page_numbers, page_numbers)
+            ):
+                del column[start:]
+                column.extend(values)
+            rows = dict(current.rows)
+            rows[doc_id] = np.arange(start, start + len(documents))
+            self._snapshot = replace(
+                current,
+                version=version,
+                tail=VectorIndex.from_normalized(tail_buffer[:tail_size]) if tail_size else current.tail,
+                tail_buffer=tail_buffer,
+                removed_at=removed_at,
+                rows=rows,
+                tombstones=tombstones,
+                size=start + len(documents)
+            )
+            self._write_document(doc_id, documents, source, page_numbers)
+            self._write_manifest()
+            logger.info(f"Published knowledge version {version}: {doc_id} with {len(documents)} chunks")
+            return version
+
+    def remove_document(self, doc_id: str) -> bool:
+        with self._lock:
+            current = self._snapshot
+            if doc_id not in current.rows:
+                return False
+            version = current.version + 1
+            rows = dict(current.rows)
+            removed = rows.pop(doc_id)
+            current.removed_at[removed] = version
+            self._snapshot = replace(
+                current,
+                version=version,
+                rows=rows,
+                tombstones=current.tombstones + len(removed)
+            )
+            self._delete_document(doc_id)
+            self._write_manifest()
+            logger.info(f"Published knowledge version {version}: removed {doc_id}")
+            return True
+
+    def needs_compaction(self) -> bool:
+        snapshot = self._snapshot
+        if not snapshot.size:
+            return False
+        return (
+            snapshot.tombstones > settings.KNOWLEDGE_TOMBSTONE_RATIO * snapshot.size
+            or len(snapshot.tail) > settings.KNOWLEDGE_TAIL_MAX
+        )
+
+    def compact(self) -> bool:
+        """Rebuild the main index from live rows only; the content version does not change.
+
+        The index is built without holding the lock, so searches and uploads carry on;
+        documents added or removed meanwhile are carried over into the new snapshot.
+        """
+        with self._compact_lock:
+            current = self._snapshot
+            if not current.tombstones and not len(current.tail):
+                return False
+            keep = np.flatnonzero(current.live())
+            vectors = _stack(current.index.row_vectors(), current.tail.row_vectors())
+            index = build_vector_index(vectors[keep] if len(keep) else [])
+            documents = [current.documents[i] for i in keep]
+            sources = [current.sources[i] for i in keep]
+            page_numbers = [current.page_numbers[i] for i in keep]
+
+            with self._lock:
+                latest = self._snapshot
+                added = np.arange(current.size, latest.size)
+                kept = np.concatenate([keep, added])
+                remap = np.full(latest.size, -1, dtype=np.int64)
+                remap[kept] = np.arange(len(kept))
+                removed_at = latest.removed_at[kept]
+                tail_start = current.size - len(current.index)
+                tail_buffer = latest.tail_buffer[tail_start:tail_start + len(added)].copy()
+                self._snapshot = replace(
+                    latest,
+                    documents=documents + latest.documents[current.size:latest.size],
+                    sources=sources + latest.sources[current.size:latest.size],
+                    page_numbers=page_numbers + latest.page_numbers[current.size:latest.size],
+                    index=index,
+                    tail=VectorIndex.from_normalized(tail_buffer),
+                    tail_buffer=tail_buffer,
+                    removed_at=removed_at,
+                    rows={doc_id: remap[rows] for doc_id, rows in latest.rows.items()},
+                    tombstones=int(np.count_nonzero(removed_at <= latest.version)),
+                    size=len(kept)
+                )
+            logger.info(f"Compacted knowledge version {current.version}: dropped {current.size - len(keep)} tombstoned chunks")
+            return True
+
+    def _document_path(self, doc_id: str) -> Path:
+        return self.manifest_path.parent / "documents" / f"{hashlib.sha256(doc_id.encode('utf-8')).hexdigest()}.json"
+
+    def _write_document(self, doc_id: str, documents, source, page_numbers):
+        """Persist one document's chunk text and metadata; embeddings live in the embedding cache."""
+        if not self.manifest_path:
+            return
+        path = self._document_path(doc_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "doc_id": doc_id,
+            "source": source,
+            "documents": list(documents),
+            "page_numbers": list(page_numbers)
+        }))
+        os.replace(tmp_path, path)
+
+    def _delete_document(self, doc_id: str):
+        if self.manifest_path:
+            self._document_path(doc_id).unlink(missing_ok=True)
+
+    def _write_manifest(self):
+        if not self.manifest_path:
+            return
+        snapshot = self._snapshot
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "version": snapshot.version,
+            "doc_ids": list(snapshot.rows)
+        }))
+        os.replace(tmp_path, self.manifest_path)
+
+    def restore(self, embed) -> bool:
+        """Reload the last published knowledge at startup; ``embed`` should hit the embedding cache."""
+        if not self.manifest_path or not self.manifest_path.exists():
+            return False
+        manifest = json.loads(self.manifest_path.read_text())
+        legacy = isinstance(manifest.get("documents"), list)
+        if legacy:
+            # Single-document manifest written before documents were keyed by ID
+            entries = [{
+                "doc_id": manifest["sources"][0] if manifest["sources"] else "default",
+                "source": manifest["sources"][0] if manifest["sources"] else "default",
+                "documents": manifest["documents"],
+                "page_numbers": manifest["page_numbers"]
+            }]
+        else:
+            entries = [json.loads(self._document_path(doc_id).read_text()) for doc_id in manifest["doc_ids"]]
+
+        documents, sources, page_numbers, rows = [], [], [], {}
+        for entry in entries:
+            rows[entry["doc_id"]] = np.arange(len(documents), len(documents) + len(entry["documents"]))
+            documents.extend(entry["documents"])
+            sources.extend([entry["source"]] * len(entry["documents"]))
+            page_numbers.extend(entry["page_numbers"])
+        index = build_vector_index(np.asarray(embed(documents), dtype=np.float32) if documents else [])
+        with self._lock:
+            self._snapshot = KnowledgeSnapshot(
+                version=manifest["version"],
+                documents=documents,
+                index=index,
+                sources=sources,
+                page_numbers=page_numbers,
+                removed_at=np.full(len(documents), NEVER_REMOVED, dtype=np.int64),
+                rows=rows,
+                size=len(documents)
+            )
+            if legacy:
+                self._write_document(**entries[0])
+                self._write_manifest()
+        return True
+
+
+knowledge_index = KnowledgeIndex(settings.KNOWLEDGE_MANIFEST_PATH)
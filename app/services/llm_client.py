@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import logging
+import time
+from ..config import settings
+from .usage_meter import usage_meter
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClient:
+    """Native asyncio access to OpenAI chat completions with a cap on in-flight requests.
+
+    Requests share the registry's pooled AsyncOpenAI client; the semaphore keeps a
+    burst of calls from opening unbounded connections, and every request carries a
+    timeout so a slow completion cannot hold a turn indefinitely. Every request's
+    tokens and latency (including the wait for a slot) go to the usage meter under
+    its ``purpose``.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.max_concurrency = settings.OPENAI_MAX_CONCURRENCY
+        self.timeout = settings.OPENAI_TIMEOUT
+        self.in_flight = 0
+        self._semaphore = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        """Hold one of the concurrency slots for the duration of a request to OpenAI."""
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    async def warmup(self):
+        """Send a one-token request so the first real turn reuses a warm connection."""
+        await self.chat_completion(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "Preloading model."},
+                {"role": "user", "content": "Hello"}
+            ],
+            temperature=0,
+            max_tokens=1,
+            purpose="warmup"
+        )
+
+    async def chat_completion(self, timeout: float = None, purpose: str = "chat", **kwargs):
+        """Run a non-streaming chat completion and return the full response."""
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        async with self._slot():
+            response = await asyncio.wait_for(
+                self.registry.async_openai_client.chat.completions.create(timeout=timeout, **kwargs),
+                timeout=timeout
+            )
+        usage_meter.record(kwargs.get("model"), getattr(response, "usage", None), time.perf_counter() - started, purpose)
+        return response
+
+    async def stream_chat_completion(self, timeout: float = None, purpose: str = "chat", **kwargs):
+        """Yield content deltas from a streamed chat completion as they arrive.
+
+        The timeout applies to opening the stream and to each wait between chunks.
+        The stream is read by a background task that gives its concurrency slot back
+        as soon as OpenAI finishes, however long the caller takes over the deltas.
+        Token usage arrives in the final chunk; a stream closed early (barge-in) is
+        recorded with its latency but without token counts.
+        """
+        deltas = asyncio.Queue()
+        reader = asyncio.create_task(self._read_stream(deltas, timeout or self.timeout, purpose, kwargs))
+        try:
+            while (delta := await deltas.get()) is not None:
+                if isinstance(delta, Exception):
+                    raise delta
+                yield delta
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+    async def _read_stream(self, deltas: asyncio.Queue, timeout: float, purpose: str, kwargs: dict):
+        """Read a streamed completion into ``deltas``, ending with None or the error raised."""
+        started = time.perf_counter()
+        first_token = None
+        usage = None
+        try:
+            async with self._slot():
+                stream = await asyncio.wait_for(
+                    self.registry.async_openai_client.chat.completions.create(
+                        timeout=timeout, stream=True, stream_options={"include_usage": True}, **kwargs
+                    ),
+                    timeout=timeout
+                )
+                try:
+                    chunks = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                        except StopAsyncIteration:
+                            break
+                        if getattr(chunk, "usage", None):
+                            usage = chunk.usage
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            if first_token is None:
+                                first_token = time.perf_counter() - started
+                            deltas.put_nowait(chunk.choices[0].delta.content)
+                finally:
+                    await stream.close()
+                    usage_meter.record(kwargs.get("model"), usage, time.perf_counter() - started, purpose, first_token)
+        except Exception as e:
+            deltas.put_nowait(e)
+        deltas.put_nowait(None)
@@ -0,0 +1,143 @@
+import asyncio
+import base64
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from .audio_frontend import wav_to_mulaw
+from .tts import tts_cache
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+MULAW_RATE = 8000  # Bytes of μ-law audio per second
+MARK_GRACE_SECONDS = 2.0  # Beyond a segment's duration before its mark is presumed lost
+
+
+class MediaStreamSpeaker:
+    """Plays the agent's speech back over a Twilio Media Streams websocket.
+
+    Each phrase is synthesized through the TTS cache and sent as a μ-law ``media``
+    message followed by a ``mark``. Twilio echoes the mark when that audio has
+    finished playing, so ``playing`` is true while any sent audio is still queued
+    at Twilio. ``clear`` drops the queued audio when the caller barges in.
+    """
+
+    def __init__(self, send_text: Callable[[str], Awaitable[None]]):
+        self.send_text = send_text
+        self.stream_sid = None
+        self.pending_marks = {}  # mark name -> seconds of audio, oldest first
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._played = asyncio.Event()
+        self._counter = 0
+
+    @property
+    def playing(self) -> bool:
+        return bool(self.pending_marks)
+
+    async def _render(self, text: str) -> Optional[bytes]:
+        try:
+            _, wav = await tts_cache.asynthesize(text)
+            return wav_to_mulaw(wav)
+        except Exception as e:
+            logger.error(f"Error synthesizing speech for media stream: {str(e)}")
+            return None
+
+    async def speak(self, text: str):
+        if not settings.TTS_ENABLED:
+            # Text-only clients; Twilio itself cannot play these
+            await self.send_text(json.dumps({"event": "media", "text": text}))
+            return
+        mulaw = await self._render(text)
+        if mulaw:
+            await self.play(mulaw)
+
+    async def speak_stream(self, segments: AsyncIterator[str], lookahead: int = None):
+        """Speak sentences as the model yields them, synthesizing ahead of playback.
+
+        Up to ``lookahead`` sentences are synthesized while an earlier one is being
+        sent and played, so only the first sentence's synthesis is on the critical
+        path. Sends are paced by Twilio's marks: a sentence goes out only once at most
+        one earlier sentence is still waiting to play, so little audio is queued at
+        Twilio for a barge-in to throw away, and look-ahead follows playback.
+        Cancelling the caller cancels the model stream and queued syntheses.
+        """
+        if not settings.TTS_ENABLED:
+            async for segment in segments:
+                await self.speak(segment)
+            return
+
+        window = asyncio.Queue()
+        # The sentence being sent plus the ones rendering ahead of it
+        slots = asyncio.Semaphore((lookahead or settings.TTS_LOOKAHEAD) + 1)
+        errors = []
+
+        async def produce():
+            try:
+                async for segment in segments:
+                    await slots.acquire()
+                    window.put_nowait(asyncio.create_task(self._render(segment)))
+            except Exception as e:
+                errors.append(e)
+            window.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (render := await window.get()) is not None:
+                mulaw = await render
+                if mulaw:
+                    await self.wait_for_playback(queued=1)
+                    await self.play(mulaw)
+                slots.release()
+            if errors:
+                raise errors[0]
+        finally:
+            producer.cancel()
+            while not window.empty():
+                render = window.get_nowait()
+                if render is not None:
+                    render.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def play(self, mulaw: bytes):
+        """Queue 8 kHz μ-law audio on the stream and mark where it ends."""
+        self._counter += 1
+        mark = f"segment-{self._counter}"
+        self.pending_marks[mark] = len(mulaw) / MULAW_RATE
+        self._drained.clear()
+        await self.send_text(json.dumps({
+            "event": "media",
+            "streamSid": self.stream_sid,
+            "media": {"payload": base64.b64encode(mulaw).decode("ascii")}
+        }))
+        await self.send_text(json.dumps({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": mark}}))
+
+    def on_mark(self, name: str):
+        self.pending_marks.pop(name, None)
+        self._played.set()
+        if not self.pending_marks:
+            self._drained.set()
+
+    async def clear(self):
+        """Stop playback immediately and forget the queued audio."""
+        await self.send_text(json.dumps({"event": "clear", "streamSid": self.stream_sid}))
+        self.pending_marks.clear()
+        self._played.set()
+        self._drained.set()
+
+    async def wait_for_playback(self, queued: int = 0):
+        """Wait until at most ``queued`` sent segments are still waiting to finish playing."""
+        while len(self.pending_marks) > queued:
+            oldest, duration = next(iter(self.pending_marks.items()))
+            self._played.clear()
+            try:
+                await asyncio.wait_for(self._played.wait(), duration + MARK_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"No mark for {oldest} on stream {self.stream_sid}; assuming it played")
+                self.on_mark(oldest)
+
+    async def wait_until_played(self, timeout: float = 30.0):
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for playback on stream {self.stream_sid}")
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO
+import numpy as np
+from .pdf_pages import count_pages, extract_page_window
+from .pdf_processor import PageChunker
+from .client_registry import client_registry
+from .embedding_cache import embedding_cache
+from .knowledge_index import knowledge_index
+from .session_store import create_session_store
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+NO_TEXT_ERROR = "Failed to extract text from PDF"
+
+
+class PDFIngestionPipeline:
+    """Page-parallel PDF ingestion that extracts, chunks, encodes and publishes as a tracked job.
+
+    Page windows are extracted in a process pool and consumed in page order, so at most
+    a few windows of text are held at once. Chunks are encoded in batches while later
+    pages are still being extracted, and each job's progress is kept in a session store
+    so any worker can report it.
+    """
+
+    def __init__(self, workers: int, page_window: int, encode_batch: int):
+        self.workers = workers
+        self.page_window = page_window
+        self.encode_batch = encode_batch
+        self.jobs = create_session_store("ingestion_jobs")
+        self._executor = None
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: forking after torch has started its threads can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _spool(self, fileobj: BinaryIO) -> str:
+        # Workers open the PDF by path instead of receiving the whole file per window
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            shutil.copyfileobj(fileobj, f)
+            return f.name
+
+    def _update(self, key: str, **fields) -> dict:
+        job = self.jobs.get(key) or {}
+        job.update(fields)
+        self.jobs[key] = job
+        return job
+
+    async def start(self, fileobj: BinaryIO, filename: str, doc_id: str = None) -> tuple[str, asyncio.Task]:
+        """Spool the upload to disk and start ingesting it in the background.
+
+        ``doc_id`` defaults to the filename, so re-uploading a file replaces its earlier version.
+        """
+        doc_id = doc_id or filename
+        path = await asyncio.get_running_loop().run_in_executor(None, self._spool, fileobj)
+        job_id = uuid.uuid4().hex
+        self._update(
+            job_id,
+            job_id=job_id,
+            filename=filename,
+            doc_id=doc_id,
+            status="queued",
+            pages_total=0,
+            pages_done=0,
+            chunks_processed=0,
+            knowledge_version=None,
+            error=None
+        )
+        task = asyncio.create_task(self._run(job_id, path, filename, doc_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id, task
+
+    async def _encode(self, chunks, documents, page_numbers, embeddings):
+        texts = [chunk for chunk, _ in chunks]
+        embeddings.append(await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: embedding_cache.get_or_encode(texts, client_registry.encoder.encode)
+        ))
+        documents.extend(texts)
+        page_numbers.extend(page for _, page in chunks)
+
+    async def _run(self, job_id: str, path: str, filename: str, doc_id: str) -> dict:
+        loop = asyncio.get_running_loop()
+        windows = deque()
+        try:
+            page_count = await loop.run_in_executor(None, count_pages, path)
+            self._update(job_id, status="extracting", pages_total=page_count)
+
+            starts = iter(range(0, page_count, self.page_window))
+
+            def submit_next():
+                start = next(starts, None)
+                if start is not None:
+                    end = min(start + self.page_window, page_count)
+                    windows.append(loop.run_in_executor(self.executor, extract_page_window, path, start, end))
+
+            for _ in range(self.workers * 2):
+                submit_next()
+
+            chunker = PageChunker()
+            documents, page_numbers, embeddings = [], [], []
+            pending = []
+            pages_done = 0
+            while windows:
+                pages = await windows.popleft()
+                submit_next()
+                for page_number, text in pages:
+                    pending.extend(chunker.feed(page_number, text))
+                pages_done += len(pages)
+                if len(pending) >= self.encode_batch:
+                    await self._encode(pending, documents, page_numbers, embeddings)
+                    pending = []
+                self._update(job_id, pages_done=pages_done, chunks_processed=len(documents))
+
+            pending.extend(chunker.close())
+            if pending:
+                await self._encode(pending, documents, page_numbers, embeddings)
+            if not documents:
+                return self._update(job_id, status="failed", error=NO_TEXT_ERROR)
+
+            # Published in one step so a replaced document swaps atomically and a failed upload leaves the old one
+            self._update(job_id, status="publishing", chunks_processed=len(documents))
+            version = await loop.run_in_executor(
+                None,
+                knowledge_index.add_document,
+                doc_id,
+                documents,
+                np.concatenate(embeddings),
+                filename,
+                page_numbers
+            )
+            return self._update(job_id, status="done", knowledge_version=version)
+
+        except Exception as e:
+            logger.error(f"Error ingesting {filename}: {str(e)}")
+            for window in windows:
+                window.cancel()
+            return self._update(job_id, status="failed", error=str(e))
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def get_job(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+pdf_ingestion = PDFIngestionPipeline(
+    settings.PDF_INGEST_WORKERS,
+    settings.PDF_PAGE_WINDOW,
+    settings.INGEST_ENCODE_BATCH
+)
@@ -0,0 +1,13 @@
+import PyPDF2
+
+# Runs in spawned ingestion workers: import nothing from the app beyond this module
+
+
+def count_pages(path: str) -> int:
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def extract_page_window(path: str, start: int, end: int) -> list[tuple[int, str]]:
+    """Extract pages [start, end) as (page number, text); runs in an ingestion worker process."""
+    reader = PyPDF2.PdfReader(path)
+    return [(n + 1, reader.pages[n].extract_text() or "") for n in range(start, end)]
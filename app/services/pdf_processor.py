@@ -1,26 +1,77 @@
 import io
 import logging
+import time
 from typing import Optional
 import PyPDF2
-from openai import OpenAI
 from datetime import datetime
 import json
+from .client_registry import client_registry
+from .usage_meter import usage_meter
 
 logger = logging.getLogger(__name__)
 
+
+class PageChunker:
+    """Streaming version of ``process_text_for_rag`` that keeps the page each chunk starts on.
+
+    Pages are fed in order and only the unfinished sentence and chunk are held between
+    pages, so a sentence that runs across a page break stays whole.
+    """
+
+    def __init__(self, chunk_size: int = 300):
+        self.chunk_size = chunk_size
+        self._remainder = ""
+        self._remainder_page = None
+        self._current = []
+        self._current_length = 0
+        self._current_page = None
+
+    def feed(self, page_number: int, text: str) -> list[tuple[str, int]]:
+        if not self._remainder:
+            self._remainder_page = page_number
+        sentences = (self._remainder + text).split('. ')
+        self._remainder = sentences.pop()
+        chunks = []
+        for i, sentence in enumerate(sentences):
+            # Only the first sentence can have started on an earlier page
+            chunks.extend(self._add(sentence, self._remainder_page if i == 0 else page_number))
+        if sentences:
+            self._remainder_page = page_number
+        return chunks
+
+    def close(self) -> list[tuple[str, int]]:
+        chunks = self._add(self._remainder, self._remainder_page) if self._remainder.strip() else []
+        self._remainder = ""
+        if self._current:
+            chunks.append((' '.join(self._current), self._current_page))
+            self._current = []
+            self._current_length = 0
+        return chunks
+
+    def _add(self, sentence: str, page_number: int) -> list[tuple[str, int]]:
+        sentence = sentence.strip() + '. '
+        sentence_length = len(sentence)
+        chunks = []
+        if self._current_length + sentence_length > self.chunk_size and self._current:
+            chunks.append((' '.join(self._current), self._current_page))
+            self._current = []
+            self._current_length = 0
+        if not self._current:
+            self._current_page = page_number
+        self._current.append(sentence)
+        self._current_length += sentence_length
+        return chunks
+
+
 class PDFProcessor:
     def __init__(self):
-        self.client = OpenAI()
+        self.client = client_registry.openai_client
 
     def extract_text_from_pdf(self, file_content: bytes) -> Optional[str]:
         try:
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            
-            for i, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                text += page_text
-            
+            text = "".join(page.extract_text() or "" for page in pdf_reader.pages)
+
             if not text.strip():
                 return None
                 
@@ -31,28 +82,9 @@ class PDFProcessor:
             return None
 
     def process_text_for_rag(self, text: str) -> list[str]:
-        sentences = text.split('. ')
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        chunk_size = 300 
-        
-        for sentence in sentences:
-            sentence = sentence.strip() + '. '
-            sentence_length = len(sentence)
-            
-            if current_length + sentence_length > chunk_size and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [sentence]
-                current_length = sentence_length
-            else:
-                current_chunk.append(sentence)
-                current_length += sentence_length
-                
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-            
-        return chunks
+        chunker = PageChunker()
+        chunks = chunker.feed(1, text) + chunker.close()
+        return [chunk for chunk, _ in chunks]
 
     def create_sales_prompt(self, company_info: dict) -> str:
         try:
@@ -87,6 +119,7 @@ class PDFProcessor:
 
     def structure_company_info(self, pdf_text: str) -> Optional[dict]:
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="gpt-4",
                 messages=[
@@ -101,6 +134,7 @@ class PDFProcessor:
                 ],
                 temperature=0.7
             )
+            usage_meter.record("gpt-4", response.usage, time.perf_counter() - started, "structure_company_info")
 
             structured_info = json.loads(response.choices[0].message.content.strip())
             return structured_info
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Optional
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators the chat format adds per message
+
+
+def _load_encoding(model: str):
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(model)
+    except ImportError:
+        logger.info("tiktoken is not installed; estimating prompt tokens from text length")
+    except Exception as e:
+        logger.warning(f"Could not load tiktoken encoding for {model}: {str(e)}")
+    return None
+
+
+@lru_cache(maxsize=32)
+def prompt_version(system_prompt: str) -> str:
+    """Short stable ID of a tenant's system prompt, so cached answers never cross prompts."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class PromptBuilder:
+    """Assembles each turn's chat messages within a fixed token budget.
+
+    The system prompt goes out once, followed by the rolling summary of folded
+    turns, the most recent history that fits, and the new user turn. Tokens are
+    counted with tiktoken when it is installed, otherwise estimated at ~4 chars each.
+    """
+
+    def __init__(self, budget: int, model: str = "gpt-3.5-turbo"):
+        self.budget = budget
+        self.encoding = _load_encoding(model)
+        self.count = lru_cache(maxsize=4096)(self._count)
+
+    def _count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def message_tokens(self, message: dict) -> int:
+        return self.count(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+    def history_tokens(self, history: list[dict]) -> int:
+        return sum(self.message_tokens(message) for message in history)
+
+    def summary_message(self, summary: str, known_entities: dict) -> dict:
+        known = {key: value for key, value in known_entities.items() if value}
+        return {
+            "role": "system",
+            "content": f"Summary of the earlier conversation: {summary}\nKnown client details: {json.dumps(known)}"
+        }
+
+    def build(self, system_prompt: str, history: list[dict], user_content: str,
+              summary: Optional[str] = None, known_entities: Optional[dict] = None) -> list[dict]:
+        """Return the messages for one turn, dropping the oldest history that does not fit."""
+        head = [{"role": "system", "content": system_prompt}]
+        if summary:
+            head.append(self.summary_message(summary, known_entities or {}))
+        user_message = {"role": "user", "content": user_content}
+
+        available = self.budget - self.history_tokens(head) - self.message_tokens(user_message)
+        recent = []
+        for message in reversed(history):
+            if message["role"] == "system":
+                continue
+            available -= self.message_tokens(message)
+            if available < 0:
+                logger.debug("Prompt budget reached; older turns left to the rolling summary")
+                break
+            recent.append(message)
+
+        return [*head, *reversed(recent), user_message]
+
+
+prompt_builder = PromptBuilder(settings.PROMPT_TOKEN_BUDGET)
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Component:
+    name: str
+    loader: Callable
+    required: bool = True
+    status: str = "pending"  # pending | loading | ready | failed
+    error: Optional[str] = None
+    load_seconds: Optional[float] = None
+
+
+class Readiness:
+    """Loads heavy components in parallel in the background and reports their state.
+
+    The app starts serving immediately; /readyz turns healthy once every required
+    component is loaded, and a failed load is recorded instead of swallowed.
+    """
+
+    def __init__(self):
+        self.components = {}
+
+    def register(self, name: str, loader: Callable, required: bool = True):
+        self.components[name] = Component(name=name, loader=loader, required=required)
+
+    async def load_all(self):
+        await asyncio.gather(*(self._load(component) for component in self.components.values()))
+
+    async def _load(self, component: Component):
+        component.status = "loading"
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(component.loader):
+                await component.loader()
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, component.loader)
+            component.status = "ready"
+            logger.info(f"Component {component.name} ready")
+        except Exception as e:
+            component.status = "failed"
+            component.error = str(e)
+            logger.error(f"Error loading component {component.name}: {str(e)}", exc_info=True)
+        finally:
+            component.load_seconds = round(time.perf_counter() - started, 3)
+
+    def is_ready(self) -> bool:
+        return all(c.status == "ready" for c in self.components.values() if c.required)
+
+    def report(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "components": {
+                c.name: {
+                    "status": c.status,
+                    "required": c.required,
+                    "error": c.error,
+                    "load_seconds": c.load_seconds
+                }
+                for c in self.components.values()
+            }
+        }
+
+
+readiness = Readiness()
@@ -0,0 +1,161 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from ..config import settings
+from .intent_engine import spoken_email, spoken_date, spoken_time
+from .sentence_buffer import SentenceBuffer
+
+logger = logging.getLogger(__name__)
+
+QUESTION_START_PATTERN = re.compile(
+    r"^(?:what|what's|how|how's|why|who|which|where|when|is|are|does|do|can|could|will|would|tell me|explain)\b",
+    re.IGNORECASE
+)
+# Words that point back into the conversation, so the answer depends on what came before
+CONTEXT_REFERENCE_PATTERN = re.compile(
+    r"\b(?:that|this|those|these|them|he|she|they|earlier|before|again|you said|you mentioned|my|our|we|i'm|i am)\b",
+    re.IGNORECASE
+)
+
+
+def is_context_free(text: str) -> bool:
+    """True for standalone product questions whose answer does not depend on the call so far."""
+    text = text.strip()
+    if not text or not (text.endswith("?") or QUESTION_START_PATTERN.match(text)):
+        return False
+    if CONTEXT_REFERENCE_PATTERN.search(text):
+        return False
+    return not (spoken_email(text)[0] or spoken_date(text) or spoken_time(text))
+
+
+def factual_answer(answer: str) -> str:
+    """The answer without its closing follow-up questions ("What's your name?"), which
+    belong to the call stage it was generated at, not to the question."""
+    sentence_buffer = SentenceBuffer()
+    sentences = [*sentence_buffer.feed(f"{answer} "), sentence_buffer.flush()]
+    sentences = [sentence for sentence in sentences if sentence]
+    while sentences and sentences[-1].rstrip('"\'”’)]').endswith("?"):
+        sentences.pop()
+    return " ".join(sentences)
+
+
+@dataclass
+class CachedResponse:
+    question: str
+    answer: str
+    embedding: np.ndarray
+    namespace: tuple  # (knowledge version, prompt version)
+    llm_latency: float  # Seconds the original LLM turn took
+    created_at: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+
+class SemanticResponseCache:
+    """Answers to context-free caller questions, reused across calls by meaning.
+
+    Entries are matched by cosine similarity of the caller's utterance embedding, only
+    within the same knowledge-base version and prompt version, and expire after
+    ``ttl_seconds``. The least recently used entry is evicted beyond ``max_items``.
+    """
+
+    def __init__(self, max_items: int, ttl_seconds: float, threshold: float):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries = OrderedDict()  # id -> CachedResponse, least recently used first
+        self._matrices = {}  # namespace -> (ids, normalized embeddings), rebuilt after changes
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.latency_saved = 0.0
+        self.total_lookup_time = 0.0
+
+    def _matrix(self, namespace: tuple):
+        if namespace not in self._matrices:
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry.namespace == namespace]
+            matrix = np.stack([self._entries[entry_id].embedding for entry_id in ids]) if ids else None
+            self._matrices[namespace] = (ids, matrix)
+        return self._matrices[namespace]
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._matrices.pop(entry.namespace, None)
+
+    def _nearest(self, embedding: np.ndarray, namespace: tuple) -> tuple[Optional[int], float]:
+        ids, matrix = self._matrix(namespace)
+        if matrix is None:
+            return None, 0.0
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        return ids[best], float(similarities[best])
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) + 1e-12)
+
+    def lookup(self, embedding, knowledge_version: int, prompt_version: str) -> Optional[CachedResponse]:
+        started = time.perf_counter()
+        namespace = (knowledge_version, prompt_version)
+        embedding = self._normalize(embedding)
+        with self._lock:
+            self.lookups += 1
+            try:
+                entry_id, similarity = self._nearest(embedding, namespace)
+                if entry_id is None or similarity < self.threshold:
+                    return None
+                entry = self._entries[entry_id]
+                if time.monotonic() - entry.created_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    return None
+                self._entries.move_to_end(entry_id)
+                entry.hits += 1
+                self.hits += 1
+                self.latency_saved += entry.llm_latency
+                logger.debug(f"Semantic cache hit ({similarity:.3f}) for: {entry.question}")
+                return entry
+            finally:
+                self.total_lookup_time += time.perf_counter() - started
+
+    def store(self, embedding, question: str, answer: str, knowledge_version: int, prompt_version: str, llm_latency: float):
+        namespace = (knowledge_version, prompt_version)
+        embedding = self._normalize(embedding)
+        with self._lock:
+            # A near-duplicate question replaces the older answer instead of adding a second one
+            entry_id, similarity = self._nearest(embedding, namespace)
+            if entry_id is not None and similarity >= self.threshold:
+                self._remove(entry_id)
+            self._entries[self._next_id] = CachedResponse(question, answer, embedding, namespace, llm_latency)
+            self._next_id += 1
+            self._matrices.pop(namespace, None)
+            self.stores += 1
+            while len(self._entries) > self.max_items:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def metrics(self) -> dict:
+        return {
+            "items": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "latency_saved_s": self.latency_saved,
+            "avg_lookup_ms": 1000 * self.total_lookup_time / self.lookups if self.lookups else 0.0
+        }
+
+
+response_cache = SemanticResponseCache(
+    settings.RESPONSE_CACHE_MAX_ITEMS,
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_THRESHOLD
+)
@@ -1,6 +1,8 @@
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
 from ..config import settings
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -10,13 +12,21 @@ class SalesforceIntegration:
         self.password = settings.SALESFORCE_PASSWORD
         self.security_token = settings.SALESFORCE_SECURITY
         self.lead_history = []
-        self.sf = Salesforce(
-            username=self.username,
-            password=self.password,
-            security_token=self.security_token
-        )
+        self._login_lock = threading.Lock()
+        self.sf = None
+        self.login()
         self.initialized = True
 
+    def login(self):
+        """Open a new Salesforce session; shared by every call until it expires."""
+        with self._login_lock:
+            self.sf = Salesforce(
+                username=self.username,
+                password=self.password,
+                security_token=self.security_token
+            )
+        return self.sf
+
     async def create_lead(self, client_entities):
         if not self.initialized:
             return False
@@ -35,7 +45,12 @@ class SalesforceIntegration:
             
             logger.info(f"Creating lead with data: {lead_data}")
             
-            response = self.sf.Lead.create(lead_data)
+            try:
+                response = self.sf.Lead.create(lead_data)
+            except SalesforceExpiredSession:
+                logger.info("Salesforce session expired, logging in again.")
+                self.login()
+                response = self.sf.Lead.create(lead_data)
             print("**********************************************")
             print("<<<<<<<<<<<<<< Response >>>>>>>>>>>>>>\n", response)
             print("**********************************************")
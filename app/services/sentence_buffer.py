@@ -0,0 +1,33 @@
+import re
+
+# Sentence terminators followed by whitespace; closing quotes/brackets stay with the sentence
+SENTENCE_END_PATTERN = re.compile(r'[.!?…]+["\'”’)\]]*\s+')
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e"}
+
+
+class SentenceBuffer:
+    """Accumulate streamed speech text and release it one complete sentence at a time."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, delta: str) -> list[str]:
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_PATTERN.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            last_word = candidate.rstrip('.!?…"\'”’)]').rsplit(" ", 1)[-1].lower()
+            if last_word in ABBREVIATIONS:
+                continue
+            if candidate:
+                sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """Return whatever text is left once the stream has finished."""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return remainder
@@ -0,0 +1,275 @@
+import abc
+import logging
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(abc.ABC):
+    """Per-call state keyed by CallSid, bounded by an idle TTL and a maximum size.
+
+    Hooks registered with ``add_end_hook`` run when a session is ended explicitly
+    (call_ends) or evicted, so related per-call maps can be cleaned up too.
+    Out-of-process backends encode values with ``dumps``/``loads`` (JSON by default).
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int, dumps=json.dumps, loads=json.loads):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.dumps = dumps
+        self.loads = loads
+        self.end_hooks = []
+
+    def add_end_hook(self, hook):
+        self.end_hooks.append(hook)
+
+    def _run_end_hooks(self, key, value):
+        for hook in self.end_hooks:
+            try:
+                hook(key, value)
+            except Exception as e:
+                logger.error(f"Error in session end hook for {key}: {str(e)}")
+
+    def end(self, key):
+        """Remove a finished session and run the end-of-call hooks."""
+        value = self.pop(key, None)
+        self._run_end_hooks(key, value)
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    @abc.abstractmethod
+    def get(self, key, default=None):
+        ...
+
+    @abc.abstractmethod
+    def __setitem__(self, key, value):
+        ...
+
+    @abc.abstractmethod
+    def pop(self, key, default=None):
+        ...
+
+    @abc.abstractmethod
+    def values(self) -> list:
+        ...
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abc.abstractmethod
+    def evict_expired(self) -> int:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; entries are kept in least-recently-used order."""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        super().__init__(ttl_seconds, max_size)
+        self._items = OrderedDict()  # key -> (value, last_access)
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        self.evict_expired()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            self._items[key] = (item[0], time.monotonic())
+            self._items.move_to_end(key)
+            return item[0]
+
+    def __setitem__(self, key, value):
+        evicted = []
+        with self._lock:
+            self._items[key] = (value, time.monotonic())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                evicted.append(self._items.popitem(last=False))
+        for evicted_key, (evicted_value, _) in evicted:
+            logger.info(f"Evicting session {evicted_key}: store is at max size {self.max_size}")
+            self._run_end_hooks(evicted_key, evicted_value)
+        self.evict_expired()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+        return item[0] if item else default
+
+    def values(self) -> list:
+        with self._lock:
+            return [value for value, _ in self._items.values()]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def evict_expired(self) -> int:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = []
+        with self._lock:
+            # Oldest access first, so stop at the first live entry
+            while self._items:
+                key, (value, last_access) = next(iter(self._items.items()))
+                if last_access >= cutoff:
+                    break
+                del self._items[key]
+                expired.append((key, value))
+        for key, value in expired:
+            self._run_end_hooks(key, value)
+        return len(expired)
+
+
+class SqliteSessionStore(SessionStore):
+    """On-disk store shared by every worker on the host.
+
+    Also serves as the local stand-in for the Redis backend: values go through the
+    same codec, so a conversation written by one worker can be resumed by another.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_size: int, dumps=json.dumps, loads=json.loads):
+        super().__init__(ttl_seconds, max_size, dumps, loads)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, last_access FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            if row[1] < time.time() - self.ttl_seconds:
+                return default
+            self.conn.execute("UPDATE sessions SET last_access = ? WHERE key = ?", (time.time(), key))
+        return self.loads(row[0])
+
+    def __setitem__(self, key, value):
+        blob = self.dumps(value)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, last_access) VALUES (?, ?, ?)",
+                (key, blob, time.time())
+            )
+            overflow = self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_size
+            rows = []
+            if overflow > 0:
+                rows = self.conn.execute(
+                    "SELECT key, value FROM sessions ORDER BY last_access ASC LIMIT ?", (overflow,)
+                ).fetchall()
+                self.conn.executemany("DELETE FROM sessions WHERE key = ?", [(row[0],) for row in rows])
+        for evicted_key, evicted_blob in rows:
+            logger.info(f"Evicting session {evicted_key}: store is at max size {self.max_size}")
+            self._run_end_hooks(evicted_key, self.loads(evicted_blob))
+        self.evict_expired()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM sessions WHERE key = ?", (key,)).fetchone()
+            self.conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+        return self.loads(row[0]) if row else default
+
+    def values(self) -> list:
+        with self._lock:
+            rows = self.conn.execute("SELECT value FROM sessions").fetchall()
+        return [self.loads(row[0]) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key, value FROM sessions WHERE last_access < ?", (cutoff,)
+            ).fetchall()
+            self.conn.execute("DELETE FROM sessions WHERE last_access < ?", (cutoff,))
+        for key, blob in rows:
+            self._run_end_hooks(key, self.loads(blob))
+        return len(rows)
+
+
+class RedisSessionStore(SessionStore):
+    """Store shared by every worker and replica; Redis key expiry enforces the idle TTL.
+
+    Max size is left to the Redis ``maxmemory`` policy, and expired keys do not run
+    end hooks since Redis drops them on its own.
+    """
+
+    def __init__(self, url: str, namespace: str, ttl_seconds: float, max_size: int, dumps=json.dumps, loads=json.loads):
+        super().__init__(ttl_seconds, max_size, dumps, loads)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("SESSION_BACKEND=redis requires the 'redis' package: pip install redis")
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def _key(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key, default=None):
+        data = self.client.getex(self._key(key), ex=int(self.ttl_seconds))
+        return self.loads(data) if data is not None else default
+
+    def __setitem__(self, key, value):
+        self.client.set(self._key(key), self.dumps(value), ex=int(self.ttl_seconds))
+
+    def pop(self, key, default=None):
+        data = self.client.getdel(self._key(key))
+        return self.loads(data) if data is not None else default
+
+    def values(self) -> list:
+        keys = list(self.client.scan_iter(match=self._key("*")))
+        return [self.loads(data) for data in self.client.mget(keys) if data is not None] if keys else []
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self._key("*")))
+
+    def evict_expired(self) -> int:
+        return 0
+
+
+def create_session_store(name: str, dumps=json.dumps, loads=json.loads) -> SessionStore:
+    """Build the session store selected by SESSION_BACKEND (memory | sqlite | redis)."""
+    if settings.SESSION_BACKEND == "redis":
+        return RedisSessionStore(
+            settings.SESSION_REDIS_URL,
+            name,
+            settings.SESSION_TTL_SECONDS,
+            settings.SESSION_MAX_SIZE,
+            dumps,
+            loads
+        )
+    if settings.SESSION_BACKEND == "sqlite":
+        Path(settings.SESSION_DB_DIR).mkdir(parents=True, exist_ok=True)
+        return SqliteSessionStore(
+            str(Path(settings.SESSION_DB_DIR) / f"{name}.db"),
+            settings.SESSION_TTL_SECONDS,
+            settings.SESSION_MAX_SIZE,
+            dumps,
+            loads
+        )
+    return InMemorySessionStore(settings.SESSION_TTL_SECONDS, settings.SESSION_MAX_SIZE)
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+from .client_registry import client_registry
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """Content-addressed speech synthesis cache, in memory and on disk under ``static/``.
+
+    Audio is keyed by the hash of text, voice, speed and sample rate, so a phrase is
+    synthesized once and then served from memory, or from disk as a static URL that
+    Twilio can ``<Play>``. Concurrent requests for the same key share one synthesis.
+    """
+
+    def __init__(self, directory: str, url_path: str, max_memory_items: int):
+        self.directory = Path(directory)
+        self.url_path = url_path.rstrip("/")
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()  # key -> WAV bytes, least recently used first
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self._tasks = set()
+
+    def key(self, text: str, voice_id: str = None, speed: float = None, sample_rate: int = None) -> str:
+        params = {
+            "text": text.strip(),
+            "voice_id": voice_id or settings.TTS_VOICE_ID,
+            "speed": speed or settings.TTS_SPEED,
+            "sample_rate": sample_rate or settings.TTS_SAMPLE_RATE
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def url(self, key: str) -> str:
+        return f"{settings.NGROK_URL}{self.url_path}/{key}.wav"
+
+    def _remember(self, key: str, audio: bytes):
+        with self._lock:
+            self._memory[key] = audio
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                return audio
+        path = self.path(key)
+        if path.exists():
+            audio = path.read_bytes()
+            self._remember(key, audio)
+            return audio
+        return None
+
+    def synthesize(self, text: str, voice_id: str = None, speed: float = None, sample_rate: int = None) -> tuple[str, bytes]:
+        """Return (key, WAV bytes) for text, calling the TTS API only on a cache miss."""
+        key = self.key(text, voice_id, speed, sample_rate)
+        audio = self._lookup(key)
+        if audio is not None:
+            self.hits += 1
+            return key, audio
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # Another caller may have finished the same phrase while we waited
+                audio = self._lookup(key)
+                if audio is not None:
+                    self.hits += 1
+                    return key, audio
+                self.misses += 1
+                audio = client_registry.smallest_client.synthesize(
+                    text.strip(),
+                    voice_id=voice_id or settings.TTS_VOICE_ID,
+                    speed=speed or settings.TTS_SPEED,
+                    sample_rate=sample_rate or settings.TTS_SAMPLE_RATE
+                )
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path(key).with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_bytes(audio)
+                os.replace(tmp_path, self.path(key))
+                self._remember(key, audio)
+                return key, audio
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    async def asynthesize(self, text: str, **prosody) -> tuple[str, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: self.synthesize(text, **prosody))
+
+    async def play_url(self, text: str, **prosody) -> str:
+        """Static URL for the phrase, synthesizing it first if needed."""
+        key, _ = await self.asynthesize(text, **prosody)
+        return self.url(key)
+
+    def cached_url(self, text: str, **prosody) -> Optional[str]:
+        """Static URL for the phrase if it is already rendered, without synthesizing."""
+        key = self.key(text, **prosody)
+        if key in self._memory or self.path(key).exists():
+            return self.url(key)
+        return None
+
+    def prefetch(self, text: str, **prosody) -> asyncio.Task:
+        """Render a phrase in the background so a later <Play> finds it cached."""
+        async def render():
+            try:
+                await self.asynthesize(text, **prosody)
+            except Exception as e:
+                logger.error(f"Error pre-rendering TTS phrase: {str(e)}")
+        task = asyncio.create_task(render())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def prerender(self, phrases: Iterable[str]):
+        """Render stock phrases ahead of time; raises if any phrase fails."""
+        await asyncio.gather(*(self.asynthesize(phrase) for phrase in phrases))
+        logger.info(f"Pre-rendered TTS phrases ({self.misses} synthesized, {self.hits} already cached)")
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_items": len(self._memory)
+        }
+
+
+tts_cache = TTSCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_URL_PATH, settings.TTS_MEMORY_CACHE_SIZE)
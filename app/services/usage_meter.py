@@ -0,0 +1,142 @@
+import logging
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from ..config import settings
+from .session_store import create_session_store
+
+logger = logging.getLogger(__name__)
+
+# USD per 1K (prompt, completion) tokens, for the spend estimate only
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-3.5-turbo-1106": (0.001, 0.002),
+    "gpt-4": (0.03, 0.06)
+}
+
+# CallSid the current request or task is working for; asyncio tasks inherit it
+current_call: ContextVar[Optional[str]] = ContextVar("current_call", default=None)
+
+call_campaigns = create_session_store("call_campaigns")  # CallSid -> campaign, for any worker
+
+
+def _empty_totals() -> dict:
+    return {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "latency_s": 0.0}
+
+
+def _add(totals: dict, record: dict):
+    totals["requests"] += 1
+    totals["prompt_tokens"] += record["prompt_tokens"]
+    totals["completion_tokens"] += record["completion_tokens"]
+    totals["cost_usd"] += record["cost_usd"]
+    totals["latency_s"] += record["latency_s"]
+
+
+def _summarize(totals: dict) -> dict:
+    requests = totals["requests"]
+    return {
+        **totals,
+        "avg_prompt_tokens": totals["prompt_tokens"] / requests if requests else 0.0,
+        "avg_completion_tokens": totals["completion_tokens"] / requests if requests else 0.0,
+        "avg_latency_ms": 1000 * totals["latency_s"] / requests if requests else 0.0
+    }
+
+
+class UsageMeter:
+    """Token, latency and spend accounting for every OpenAI request made by this process.
+
+    Each request is attributed to the CallSid in ``current_call`` (if any) and that
+    call's campaign, and aggregated per call, per campaign, per model and per purpose
+    (turn, summary, compaction, warmup, ...). Per-call records keep the last
+    ``max_calls`` calls, including every individual request.
+    """
+
+    def __init__(self, max_calls: int):
+        self.max_calls = max_calls
+        self._lock = threading.Lock()
+        self.totals = _empty_totals()
+        self.models = {}
+        self.purposes = {}
+        self.campaigns = {}
+        self.calls = OrderedDict()  # CallSid -> {"campaign", "totals", "requests"}
+
+    def bind(self, call_sid: Optional[str]):
+        """Attribute OpenAI requests made from here on (and in tasks started here) to a call."""
+        current_call.set(call_sid)
+
+    def assign_campaign(self, call_sid: str, campaign: Optional[str]):
+        if campaign:
+            call_campaigns[call_sid] = campaign
+
+    def _call_entry(self, call_sid: str, campaign: Optional[str]) -> dict:
+        entry = self.calls.get(call_sid)
+        if entry is None:
+            entry = {"campaign": campaign, "totals": _empty_totals(), "requests": []}
+            self.calls[call_sid] = entry
+            while len(self.calls) > self.max_calls:
+                self.calls.popitem(last=False)
+        self.calls.move_to_end(call_sid)
+        return entry
+
+    def record(self, model: str, usage, latency: float, purpose: str, first_token_latency: float = None):
+        """Record one completed (or abandoned) request; ``usage`` is the OpenAI usage object or None."""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "model": model,
+            "purpose": purpose,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000,
+            "latency_s": latency,
+            "first_token_s": first_token_latency,
+            "usage_reported": usage is not None
+        }
+        call_sid = current_call.get()
+        try:
+            # Look the campaign up once per call, outside the lock (it may be a Redis round trip)
+            campaign = call_campaigns.get(call_sid) if call_sid and call_sid not in self.calls else None
+            with self._lock:
+                _add(self.totals, record)
+                _add(self.models.setdefault(model, _empty_totals()), record)
+                _add(self.purposes.setdefault(purpose, _empty_totals()), record)
+                if call_sid:
+                    entry = self._call_entry(call_sid, campaign)
+                    _add(entry["totals"], record)
+                    entry["requests"].append(record)
+                    if entry["campaign"]:
+                        _add(self.campaigns.setdefault(entry["campaign"], _empty_totals()), record)
+        except Exception as e:
+            logger.error(f"Error recording LLM usage: {str(e)}")
+
+    def call_usage(self, call_sid: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.calls.get(call_sid)
+            if entry is None:
+                return None
+            return {
+                "call_sid": call_sid,
+                "campaign": entry["campaign"],
+                "totals": _summarize(entry["totals"]),
+                "requests": list(entry["requests"])
+            }
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "totals": _summarize(self.totals),
+                "models": {model: _summarize(totals) for model, totals in self.models.items()},
+                "purposes": {purpose: _summarize(totals) for purpose, totals in self.purposes.items()},
+                "campaigns": {campaign: _summarize(totals) for campaign, totals in self.campaigns.items()},
+                "calls": {
+                    call_sid: {"campaign": entry["campaign"], **_summarize(entry["totals"])}
+                    for call_sid, entry in self.calls.items()
+                }
+            }
+
+
+usage_meter = UsageMeter(settings.USAGE_MAX_CALLS)
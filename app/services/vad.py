@@ -0,0 +1,116 @@
+import numpy as np
+from ..config import settings
+
+
+class UtteranceSegmenter:
+    """Energy-based voice activity detection that cuts a PCM stream into whole utterances.
+
+    The speech threshold tracks an adaptive noise floor, an utterance starts after a
+    short run of voiced audio (with a little pre-roll kept), and it ends after a
+    silence that shrinks as the utterance gets longer: a short "yes" waits longer
+    for a continuation than the end of a long sentence does. The segmenter holds no
+    audio itself; ``feed`` returns ``(kind, start, end)`` events in absolute sample
+    positions: ``speech_start``, ``barge_in`` once the utterance has ``barge_in_ms`` of
+    voiced speech (a cough or a click never gets there), ``partial`` at a fixed interval
+    while the caller is talking (none if ``partial_interval_ms`` is 0), and
+    ``utterance`` once speech has ended.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        threshold_ratio: float = settings.VAD_THRESHOLD_RATIO,
+        min_silence_ms: float = settings.VAD_MIN_SILENCE_MS,
+        max_silence_ms: float = settings.VAD_MAX_SILENCE_MS,
+        max_utterance_ms: float = settings.VAD_MAX_UTTERANCE_MS,
+        partial_interval_ms: float = settings.VAD_PARTIAL_INTERVAL_MS,
+        barge_in_ms: float = settings.VAD_BARGE_IN_MS,
+        min_energy: float = 0.005,
+        onset_ms: float = 60,
+        preroll_ms: float = 200
+    ):
+        self.sample_rate = sample_rate
+        self.threshold_ratio = threshold_ratio
+        self.min_silence_ms = min_silence_ms
+        self.max_silence_ms = max_silence_ms
+        self.max_utterance_ms = max_utterance_ms
+        self.partial_interval_ms = partial_interval_ms
+        self.barge_in_ms = barge_in_ms
+        self.min_energy = min_energy
+        self.onset_ms = onset_ms
+        self.preroll_ms = preroll_ms
+        self.noise_floor = None
+        self.in_speech = False
+        self._voiced_run = 0.0
+        self._run_start = 0
+        self._reset_utterance()
+
+    def _reset_utterance(self):
+        self.in_speech = False
+        self._start = 0
+        self._voiced_end = 0  # Position just past the last voiced frame
+        self._utterance_ms = 0.0
+        self._silence_ms = 0.0
+        self._since_partial_ms = 0.0
+        self._voiced_ms = 0.0
+        self._barged_in = False
+
+    def _is_voiced(self, energy: float) -> bool:
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        voiced = energy > max(self.min_energy, self.noise_floor * self.threshold_ratio)
+        if not voiced:
+            # Follow the floor down quickly and up slowly, so speech cannot drag it up
+            rate = 0.5 if energy < self.noise_floor else 0.02
+            self.noise_floor += rate * (energy - self.noise_floor)
+        return voiced
+
+    def end_of_speech_ms(self) -> float:
+        progress = min(1.0, self._utterance_ms / 3000)
+        return self.max_silence_ms - progress * (self.max_silence_ms - self.min_silence_ms)
+
+    def feed(self, samples: np.ndarray, end: int) -> list[tuple[str, int, int]]:
+        """Score one frame of samples ending at absolute position ``end``."""
+        if not len(samples):
+            return []
+        duration = 1000 * len(samples) / self.sample_rate
+        voiced = self._is_voiced(float(np.sqrt(np.dot(samples, samples) / len(samples))))
+
+        if not self.in_speech:
+            if not voiced:
+                self._voiced_run = 0.0
+                return []
+            if not self._voiced_run:
+                self._run_start = end - len(samples)
+            self._voiced_run += duration
+            if self._voiced_run < self.onset_ms:
+                return []
+            self.in_speech = True
+            self._voiced_ms = self._voiced_run
+            self._voiced_run = 0.0
+            self._start = max(0, self._run_start - int(self.preroll_ms * self.sample_rate / 1000))
+            self._voiced_end = end
+            self._utterance_ms = 1000 * (end - self._start) / self.sample_rate
+            return [("speech_start", self._start, end)]
+
+        self._utterance_ms += duration
+        self._since_partial_ms += duration
+        if voiced:
+            self._silence_ms = 0.0
+            self._voiced_end = end
+            self._voiced_ms += duration
+        else:
+            self._silence_ms += duration
+
+        if self._silence_ms >= self.end_of_speech_ms() or self._utterance_ms >= self.max_utterance_ms:
+            # Trailing silence is dropped so ASR only sees the speech
+            event = ("utterance", self._start, self._voiced_end)
+            self._reset_utterance()
+            return [event]
+        if not self._barged_in and self._voiced_ms >= self.barge_in_ms:
+            self._barged_in = True
+            return [("barge_in", self._start, self._voiced_end)]
+        if self.partial_interval_ms and self._since_partial_ms >= self.partial_interval_ms:
+            self._since_partial_ms = 0.0
+            return [("partial", self._start, self._voiced_end)]
+        return []
@@ -0,0 +1,136 @@
+import logging
+import numpy as np
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(vectors) -> np.ndarray:
+    """Return L2-normalized float32 rows, so cosine similarity is a plain dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without sorting the whole array."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class VectorIndex:
+    """Exact cosine search over pre-normalized float32 embeddings.
+
+    A query costs one matrix-vector product plus an argpartition.
+    """
+
+    def __init__(self, embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.vectors = normalize(embeddings) if embeddings.size else np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def row_vectors(self) -> np.ndarray:
+        """Normalized embeddings in insertion order."""
+        return self.vectors
+
+    @classmethod
+    def from_normalized(cls, vectors: np.ndarray) -> "VectorIndex":
+        """Exact index over rows that are already normalized; the array is used as is, not copied."""
+        index = cls.__new__(cls)
+        index.vectors = vectors
+        return index
+
+    def search(self, query, k: int = 3, mask: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (indices, similarities) of the k nearest rows, best first.
+
+        ``mask`` is an optional boolean array over rows; rows where it is False are skipped.
+        """
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        scores = self.vectors @ normalize(query)[0]
+        if mask is None:
+            indices = top_k(scores, k)
+        else:
+            rows = np.flatnonzero(mask)
+            indices = rows[top_k(scores[rows], k)]
+        return indices, scores[indices]
+
+
+class IVFVectorIndex(VectorIndex):
+    """Approximate search for large corpora using an inverted file of k-means clusters.
+
+    Rows are stored grouped by cluster, so a query scores the centroids and then
+    only the contiguous slices of the ``n_probe`` closest clusters.
+    """
+
+    def __init__(self, embeddings, n_lists: int = None, n_probe: int = None, iterations: int = 10, seed: int = 0):
+        super().__init__(embeddings)
+        vectors = self.vectors
+        self.n_lists = max(1, min(n_lists or int(np.sqrt(len(vectors))), len(vectors)))
+        self.n_probe = min(n_probe or settings.ANN_PROBES, self.n_lists)
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), self.n_lists * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            # Sum members per cluster in one pass; empty clusters keep their old centroid
+            order = np.argsort(assignments, kind="stable")
+            clusters, starts = np.unique(assignments[order], return_index=True)
+            centroids[clusters] = np.add.reduceat(sample[order], starts, axis=0)
+            centroids = normalize(centroids)
+        self.centroids = centroids
+
+        assignments = np.concatenate([
+            np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), 65536)
+        ])
+        order = np.argsort(assignments, kind="stable")
+        self.ids = order
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=self.n_lists))])
+
+    def row_vectors(self) -> np.ndarray:
+        rows = np.empty_like(self.vectors)
+        rows[self.ids] = self.vectors
+        return rows
+
+    def search(self, query, k: int = 3, mask: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        query = normalize(query)[0]
+        probes = top_k(self.centroids @ query, self.n_probe)
+        positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+        scores = np.concatenate([self.vectors[self.offsets[c]:self.offsets[c + 1]] @ query for c in probes])
+        if mask is not None:
+            live = mask[self.ids[positions]]
+            positions, scores = positions[live], scores[live]
+        if len(positions) < k:
+            # Too few candidates in the probed clusters; fall back to an exact scan
+            positions = np.arange(len(self.vectors))
+            scores = self.vectors @ query
+            if mask is not None:
+                live = mask[self.ids]
+                positions, scores = positions[live], scores[live]
+        best = top_k(scores, k)
+        return self.ids[positions[best]], scores[best]
+
+
+def build_vector_index(embeddings) -> VectorIndex:
+    """Pick exact or approximate search based on VECTOR_SEARCH_MODE and corpus size."""
+    count = len(embeddings)
+    mode = settings.VECTOR_SEARCH_MODE
+    if count and (mode == "ann" or (mode == "auto" and count >= settings.ANN_MIN_VECTORS)):
+        logger.info(f"Building approximate vector index over {count} vectors")
+        return IVFVectorIndex(embeddings)
+    return VectorIndex(embeddings)
@@ -18,6 +18,53 @@ END_CALL_PHRASES = [
     "thank you"
 ]
 
+# Answers to the end-call confirmation, matched on word boundaries
+AFFIRM_PHRASES = [
+    "yes", "yeah", "yep", "yup", "sure", "okay", "ok", "correct", "right", "absolutely",
+    "of course", "go ahead", "please do", "that's right", "definitely"
+]
+DENY_PHRASES = [
+    "no", "nope", "nah", "not yet", "not now", "not right now", "not sure", "don't", "do not",
+    "wait", "hold on", "never mind", "continue", "keep going", "one more question"
+]
+
+# Labelled examples for nearest-neighbour intent matching on the shared MiniLM encoder
+INTENT_EXAMPLES = {
+    "affirm": [
+        "yes", "yes please", "yeah sure", "okay", "sure go ahead", "that's right",
+        "correct", "absolutely", "yes you can end the call", "sounds good"
+    ],
+    "deny": [
+        "no", "no thanks", "not yet", "no let's continue", "wait I have a question",
+        "actually no", "not right now", "no I want to keep talking"
+    ],
+    "end_call": [
+        "bye", "goodbye", "I have to go now", "please end the call", "I'm not interested, bye",
+        "that's all, thank you", "talk to you later", "stop calling me", "hang up", "I'm done"
+    ],
+    "other": [
+        "what services do you offer", "tell me about your pricing", "my name is John",
+        "we are a retail company", "can we meet tomorrow", "how does it work",
+        "thank you for explaining that", "okay so what's next", "yes I run a small business",
+        "I'm not sure, tell me more"
+    ]
+}
+
+NO_INPUT_REPLY = "I didn't catch that. Could you please repeat?"
+END_CALL_PROMPT = "Would you like to end our conversation?"
+CALL_ENDED_REPLY = "Thank you for your time. The call has ended."
+INVALID_EMAIL_GOODBYE = "Thank you for your time. However, there was an issue with the email provided."
+GOODBYE_REPLY = "Thank you for your time. Have a great day!"
+ERROR_REPLY = "I apologize, but I'm having trouble processing that. Could you please repeat?"
+CONTINUE_CALL_REPLY = "Sure, let's keep going. What else would you like to know?"
+EMAIL_CAPTURED_REPLY = "Got it, I have your email as {email}. And what's the name of your company?"
+# The opening DEFAULT_SALES_PROMPT scripts for every call, served without an LLM round trip
+FIRST_TURN_REPLY = (
+    "Hey, this is Vaani — smart AI sales agent! I make calls, follow up, and book meetings "
+    "so your team can focus on closing deals. What kind of work do you do?"
+)
+CALL_ERROR_REPLY = "I apologize, but I'm having trouble. Could you please repeat that?"
+
 OUTBOUND_GREETING_TEMPLATE = "Hello!{user_name_part} I'm Vaani AI. I can help you to increase your sales. Is this a good time to talk?"
 
 DEFAULT_SALES_PROMPT = f"""
@@ -199,3 +246,31 @@ Use natural prompts like:
 
 -----
 """
+
+# Sent once per request in the system message rather than repeated in every user turn
+ENTITY_REPLY_INSTRUCTIONS = (
+    "Important: Update and include all entities in your response after [[ENTITIES]] tag, "
+    "even if they haven't changed. Use format:\n"
+    "Your response text\n"
+    "[[ENTITIES]]\n"
+    '{"entities": {...}}\n'
+    "[[END_ENTITIES]]"
+)
+
+HISTORY_SUMMARY_PROMPT = """Condense this part of a sales call into a short running summary for the agent.
+Keep the caller's stated needs, objections, answers to questions already asked, any offered or agreed meeting times, and contact details.
+If a previous summary is given, merge it in. Reply with the summary only, in under 120 words."""
+
+# Fixed lines rendered once at startup and served as cached audio
+STOCK_PHRASES = [
+    OUTBOUND_GREETING_TEMPLATE.format(user_name_part=""),
+    NO_INPUT_REPLY,
+    END_CALL_PROMPT,
+    CALL_ENDED_REPLY,
+    INVALID_EMAIL_GOODBYE,
+    GOODBYE_REPLY,
+    ERROR_REPLY,
+    CALL_ERROR_REPLY,
+    CONTINUE_CALL_REPLY,
+    FIRST_TURN_REPLY
+]
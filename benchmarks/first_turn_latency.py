@@ -0,0 +1,54 @@
+"""Measure first LLM turn latency with per-call clients versus the shared client registry.
+
+Usage:
+    python -m benchmarks.first_turn_latency --calls 10
+
+"before" reproduces the old behaviour: every call gets a fresh registry, so it
+builds its own OpenAI/Smallest clients, refreshes Google credentials and logs
+in to Salesforce. "after" borrows the process-wide registry. Both modes need
+the real credentials from .env, since the point is to time real handshakes.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from app.services.ai_agent import AI_SalesAgent
+from app.services.client_registry import ClientRegistry, client_registry
+from app.utils.constants import FIRST_TURN_REPLY
+
+# The scripted opening is answered locally, so time the caller's answer to it instead;
+# a statement rather than a question, so the response cache never serves it either
+OPENING = [{"role": "user", "content": "Hi, who is this?"}, {"role": "assistant", "content": FIRST_TURN_REPLY}]
+CALLER_TURN = "We run a small retail business with about twenty people on the team."
+
+
+async def first_turn(registry, eager: bool) -> float:
+    start = time.perf_counter()
+    agent = AI_SalesAgent(registry=registry)
+    if eager:
+        # The old constructor built these unconditionally
+        agent.smallestai_client
+        agent.calendar_manager
+        agent.salesforce_integration
+    agent.conversation_history.extend(OPENING)
+    await agent.generate_response(CALLER_TURN)
+    return time.perf_counter() - start
+
+
+async def run(calls: int):
+    results = {}
+    results["before"] = [await first_turn(ClientRegistry(), eager=True) for _ in range(calls)]
+    results["after"] = [await first_turn(client_registry, eager=False) for _ in range(calls)]
+
+    for mode, timings in results.items():
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{mode:>6}: p50={statistics.median(timings) * 1000:.0f}ms "
+              f"p95={p95 * 1000:.0f}ms max={timings[-1] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
@@ -0,0 +1,54 @@
+"""Measure knowledge retrieval latency and recall as the corpus grows.
+
+Usage:
+    python -m benchmarks.vector_search --sizes 500 10000 100000 --queries 200
+
+Uses random 384-dimensional vectors (the all-MiniLM-L6-v2 width), so no model
+or credentials are needed. Recall is the share of exact top-3 results the
+approximate index also returns.
+"""
+import argparse
+import time
+import numpy as np
+from app.services.vector_index import IVFVectorIndex, VectorIndex
+
+
+def time_queries(index, queries, k: int) -> tuple[float, list]:
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append(index.search(query, k)[0])
+    return (time.perf_counter() - start) / len(queries), results
+
+
+def run(sizes: list[int], query_count: int, k: int, dim: int = 384):
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        # Clustered data behaves more like real chunk embeddings than uniform noise
+        centers = rng.standard_normal((max(1, size // 200), dim)).astype(np.float32)
+        corpus = centers[rng.integers(len(centers), size=size)] + 0.3 * rng.standard_normal((size, dim)).astype(np.float32)
+        queries = corpus[rng.integers(size, size=query_count)] + 0.1 * rng.standard_normal((query_count, dim)).astype(np.float32)
+
+        exact = VectorIndex(corpus)
+        exact_latency, exact_results = time_queries(exact, queries, k)
+        line = f"{size:>8} chunks: exact {exact_latency * 1000:.3f}ms/query"
+
+        if size >= 1000:
+            build_start = time.perf_counter()
+            ann = IVFVectorIndex(corpus)
+            build_time = time.perf_counter() - build_start
+            ann_latency, ann_results = time_queries(ann, queries, k)
+            recall = np.mean([
+                len(set(a.tolist()) & set(e.tolist())) / len(e) for a, e in zip(ann_results, exact_results)
+            ])
+            line += f", ann {ann_latency * 1000:.3f}ms/query (recall@{k} {recall:.2f}, build {build_time:.1f}s)"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.k)
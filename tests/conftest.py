@@ -0,0 +1,11 @@
+import os
+
+# app.config requires these; the tests never reach the real services
+for name in [
+    "OPENAI_API_KEY", "SMALLEST_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_FROM_NUMBER",
+    "SALESFORCE_USERNAME", "SALESFORCE_PASSWORD", "SALESFORCE_SECURITY", "GOOGLE_CLIENT_ID",
+    "GOOGLE_CLIENT_SECRET", "GOOGLE_REDIRECT_URI", "GOOGLE_REFRESH_TOKEN"
+]:
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("NGROK_URL", "https://example.test")
+os.environ.setdefault("TTS_ENABLED", "false")  # Replies go out as text events instead of synthesized audio
@@ -0,0 +1,72 @@
+import io
+import wave
+import warnings
+import numpy as np
+import pytest
+from app.services.audio_frontend import (
+    AudioRingBuffer, CallAudioFrontend, MULAW_ENCODE_TABLE, MULAW_TABLE, wav_to_mulaw
+)
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    audioop = pytest.importorskip("audioop")  # Reference implementation; removed in Python 3.13
+
+
+def test_decode_table_matches_audioop():
+    codes = bytes(range(256))
+    expected = np.frombuffer(audioop.ulaw2lin(codes, 2), dtype=np.int16) / 32768.0
+    assert np.array_equal(MULAW_TABLE, expected.astype(np.float32))
+
+
+def test_encode_table_matches_audioop():
+    pcm = np.arange(-32768, 32768, dtype=np.int16)
+    expected = np.frombuffer(audioop.lin2ulaw(pcm.tobytes(), 2), dtype=np.uint8)
+    assert np.array_equal(MULAW_ENCODE_TABLE[pcm.view(np.uint16)], expected)
+
+
+def test_wav_to_mulaw_resamples_to_8khz():
+    pcm = (8000 * np.sin(np.arange(1600) / 5)).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(pcm.tobytes())
+    assert len(wav_to_mulaw(buffer.getvalue())) == 800
+
+
+def test_ring_buffer_reads_across_the_wrap():
+    ring = AudioRingBuffer(10)
+    samples = np.arange(25, dtype=np.float32)
+    for start in range(0, 25, 7):
+        block = samples[start:start + 7]
+        ring.write(block)
+        ring.commit(len(block))
+    assert ring.end == 25
+    assert np.array_equal(ring.read(17, 23), samples[17:23])  # Wraps at 20
+    assert np.array_equal(ring.read(15, 25), samples[15:25])  # Whole ring, ending on the boundary
+    # Overwritten samples are clamped away rather than read back stale
+    assert np.array_equal(ring.read(5, 25), samples[15:25])
+    assert len(ring.read(20, 20)) == 0
+
+
+def test_ring_buffer_writable_view_only_without_wrap():
+    ring = AudioRingBuffer(10)
+    view = ring.writable(6)
+    view[:] = 1.0
+    ring.commit(6)
+    assert ring.writable(6) is None
+    assert np.array_equal(ring.read(0, 6), np.ones(6, dtype=np.float32))
+
+
+def test_frontend_upsamples_through_the_ring():
+    frontend = CallAudioFrontend(partials=False)
+    codes = np.frombuffer(audioop.lin2ulaw((np.arange(160, dtype=np.int16) * 100).tobytes(), 2), dtype=np.uint8)
+    for _ in range(3):
+        frontend.push(codes.tobytes())
+    decoded = MULAW_TABLE[codes]
+    audio = frontend.ring.read(0, frontend.ring.end)
+    assert len(audio) == 960
+    # Odd outputs are the 8 kHz samples, even outputs the midpoints between them
+    assert np.array_equal(audio[1:320:2], decoded)
+    assert np.allclose(audio[2:320:2], (decoded[:-1] + decoded[1:]) / 2)
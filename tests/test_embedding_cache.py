@@ -0,0 +1,76 @@
+import threading
+import zlib
+import numpy as np
+import pytest
+from app.services.embedding_cache import EmbeddingCache, fcntl
+
+
+class Encoder:
+    """Deterministic stand-in for the sentence encoder that records what it was asked to encode."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[zlib.crc32(text.encode()) % 97, len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def shard_count(cache) -> int:
+    return len(list(cache.directory.glob("*.keys")))
+
+
+def test_cached_chunks_are_not_encoded_again_after_a_restart(tmp_path):
+    encode = Encoder()
+    first = EmbeddingCache(str(tmp_path), "test/model").get_or_encode(["alpha", "beta"], encode)
+    assert encode.calls == [["alpha", "beta"]]
+
+    restarted = EmbeddingCache(str(tmp_path), "test/model")
+    again = restarted.get_or_encode(["beta", "gamma", "alpha", "gamma"], encode)
+    assert encode.calls[1:] == [["gamma"]]
+    assert np.array_equal(again[[0, 2]], first[[1, 0]])
+    assert np.array_equal(again[1], again[3])
+
+
+def test_other_models_do_not_share_entries(tmp_path):
+    encode = Encoder()
+    EmbeddingCache(str(tmp_path), "test/model").get_or_encode(["alpha"], encode)
+    EmbeddingCache(str(tmp_path), "test/other-model").get_or_encode(["alpha"], encode)
+    assert encode.calls == [["alpha"], ["alpha"]]
+
+
+@pytest.mark.skipif(fcntl is None, reason="shards are only merged where fcntl is available")
+def test_shards_are_merged_past_the_threshold(tmp_path):
+    encode = Encoder()
+    cache = EmbeddingCache(str(tmp_path), "test/model", max_shards=2)
+    texts = [f"chunk {i}" for i in range(4)]
+    expected = encode(texts)
+    for text in texts:
+        cache.get_or_encode([text], encode)
+    # The fourth lookup found three shards and merged them before writing its own
+    assert shard_count(cache) == 2
+
+    assert np.array_equal(cache.get_or_encode(texts, encode), expected)
+    restarted = EmbeddingCache(str(tmp_path), "test/model", max_shards=2)
+    calls = len(encode.calls)
+    assert np.array_equal(restarted.get_or_encode(texts, encode), expected)
+    assert len(encode.calls) == calls
+
+
+def test_encoding_runs_outside_the_cache_lock(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "test/model")
+    encode = Encoder()
+    both_encoding = threading.Barrier(2, timeout=5)
+
+    def slow_encode(texts):
+        assert not cache._lock.locked()
+        both_encoding.wait()  # Fails unless the other ingest is encoding at the same time
+        return encode(texts)
+
+    threads = [threading.Thread(target=cache.get_or_encode, args=([text], slow_encode)) for text in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(call[0] for call in encode.calls) == ["a", "b"]
+    assert cache.get_or_encode(["a", "b"], encode).shape == (2, 3)
@@ -0,0 +1,72 @@
+import asyncio
+import zlib
+from datetime import date
+import numpy as np
+import pytest
+from app.services.intent_engine import IntentEngine
+
+
+async def bag_of_words(text: str) -> np.ndarray:
+    """Deterministic stand-in for the MiniLM encoder."""
+    vector = np.zeros(256, dtype=np.float32)
+    for word in text.lower().replace(",", " ").split():
+        vector[zlib.crc32(word.encode()) % 256] += 1.0
+    return vector
+
+
+def confirmation(text: str):
+    return asyncio.run(IntentEngine(bag_of_words, 0.6).confirmation(text))
+
+
+@pytest.mark.parametrize("text", ["Yes", "sure", "Right.", "Okay, go ahead", "Yes, that's right!"])
+def test_whole_affirmation_is_yes(text):
+    assert confirmation(text) == "affirm"
+
+
+@pytest.mark.parametrize("text", [
+    "Not right now", "I'm not sure", "No", "Sure, but not yet", "I don't think so", "Right, wait a second"
+])
+def test_negated_answer_is_not_yes(text):
+    assert confirmation(text) == "deny"
+
+
+@pytest.mark.parametrize("text", ["okay bye", "goodbye", "I'm not interested, bye"])
+def test_goodbye_confirms_end_call(text):
+    assert confirmation(text) == "affirm"
+
+
+TODAY = date(2026, 10, 18)  # A Sunday
+
+
+@pytest.mark.parametrize("text", ["How are you today?", "I'm busy on Mondays", "Hi, who is calling today?"])
+def test_small_talk_sets_no_meeting_date(text):
+    assert "meeting_date" not in IntentEngine(bag_of_words, 0.6).extract_slots(text, TODAY)
+
+
+def test_scheduling_turn_resolves_relative_date():
+    engine = IntentEngine(bag_of_words, 0.6)
+    assert engine.extract_slots("Can we meet tomorrow at 3 pm?", TODAY) == {
+        "meeting_date": "19-10-2026", "meeting_time": "15:00"
+    }
+    assert engine.extract_slots("Monday works", TODAY, scheduling=True) == {"meeting_date": "19-10-2026"}
+
+
+def test_explicit_date_needs_no_scheduling_cue():
+    assert IntentEngine(bag_of_words, 0.6).extract_slots("The 25th of March", TODAY) == {"meeting_date": "25-03-2027"}
+
+
+def test_long_turn_without_closing_cue_skips_the_encoder():
+    calls = []
+
+    async def embed(text):
+        calls.append(text)
+        return await bag_of_words(text)
+
+    engine = IntentEngine(embed, 0.6)
+    text = "We mostly use spreadsheets for scheduling and it gets messy when the team grows"
+    assert asyncio.run(engine.is_end_call(text)) is False
+    assert calls == []
+
+
+def test_short_closing_turn_ends_the_call():
+    assert asyncio.run(IntentEngine(bag_of_words, 0.6).is_end_call("okay, thank you bye")) is True
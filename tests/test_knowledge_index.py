@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from app.services import knowledge_index as knowledge_module
+from app.services.knowledge_index import KnowledgeIndex
+
+DIM = 8
+
+
+def basis(*axes) -> np.ndarray:
+    """One unit vector per chunk, pointing along the given axis."""
+    return np.eye(DIM, dtype=np.float32)[list(axes)]
+
+
+def add(index, doc_id, axes):
+    chunks = [f"{doc_id} chunk {axis}" for axis in axes]
+    return index.add_document(doc_id, chunks, basis(*axes), f"{doc_id}.pdf", [1] * len(axes))
+
+
+def best(snapshot, axis, k=1):
+    rows, _ = snapshot.search(basis(axis)[0], k)
+    return [snapshot.documents[row] for row in rows]
+
+
+def test_added_documents_are_searchable():
+    index = KnowledgeIndex()
+    assert add(index, "pricing", [0, 1]) == 1
+    assert add(index, "faq", [2]) == 2
+    snapshot = index.snapshot()
+    assert len(snapshot) == 3
+    assert best(snapshot, 1) == ["pricing chunk 1"]
+    assert best(snapshot, 2) == ["faq chunk 2"]
+    assert {doc["doc_id"]: doc["chunks"] for doc in index.list_documents()} == {"pricing": 2, "faq": 1}
+
+
+def test_removed_document_is_not_returned():
+    index = KnowledgeIndex()
+    add(index, "pricing", [0])
+    add(index, "faq", [1])
+    assert index.remove_document("pricing")
+    assert not index.remove_document("pricing")
+    snapshot = index.snapshot()
+    assert len(snapshot) == 1
+    assert best(snapshot, 0, k=3) == ["faq chunk 1"]
+
+
+def test_replacing_a_document_leaves_earlier_snapshots_intact():
+    index = KnowledgeIndex()
+    add(index, "pricing", [0])
+    before = index.snapshot()
+    add(index, "pricing", [3])
+    after = index.snapshot()
+    assert best(before, 0) == ["pricing chunk 0"] and len(before) == 1
+    assert best(after, 0, k=3) == ["pricing chunk 3"] and len(after) == 1
+
+
+def test_compaction_drops_tombstones_and_keeps_results():
+    index = KnowledgeIndex()
+    for axis in range(4):
+        add(index, f"doc{axis}", [axis])
+    index.remove_document("doc1")
+    version = index.version
+    assert index.compact()
+    snapshot = index.snapshot()
+    assert snapshot.version == version
+    assert snapshot.tombstones == 0 and not len(snapshot.tail) and len(snapshot.index) == 3
+    assert snapshot.documents == ["doc0 chunk 0", "doc2 chunk 2", "doc3 chunk 3"]
+    assert best(snapshot, 3) == ["doc3 chunk 3"]
+    assert not index.compact()
+
+
+def test_changes_during_compaction_are_carried_over(monkeypatch):
+    index = KnowledgeIndex()
+    add(index, "doc0", [0])
+    add(index, "doc1", [1])
+    index.remove_document("doc0")
+    build = knowledge_module.build_vector_index
+
+    def build_while_uploading(embeddings):
+        # Uploads and searches are not blocked while the index is built
+        add(index, "doc2", [2])
+        index.remove_document("doc1")
+        assert best(index.snapshot(), 2) == ["doc2 chunk 2"]
+        return build(embeddings)
+
+    monkeypatch.setattr(knowledge_module, "build_vector_index", build_while_uploading)
+    assert index.compact()
+    snapshot = index.snapshot()
+    assert snapshot.documents == ["doc1 chunk 1", "doc2 chunk 2"]
+    assert len(snapshot) == 1 and snapshot.tombstones == 1
+    assert best(snapshot, 1, k=3) == ["doc2 chunk 2"]
+    assert set(snapshot.rows) == {"doc2"}
+
+
+def test_needs_compaction_when_tail_or_tombstones_grow(monkeypatch):
+    monkeypatch.setattr(knowledge_module.settings, "KNOWLEDGE_TAIL_MAX", 2)
+    index = KnowledgeIndex()
+    assert not index.needs_compaction()
+    add(index, "doc", [0, 1])
+    assert not index.needs_compaction()
+    add(index, "more", [2])
+    assert index.needs_compaction()
+
+
+@pytest.mark.parametrize("k", [1, 10])
+def test_empty_document_adds_nothing(k):
+    index = KnowledgeIndex()
+    add(index, "empty", [])
+    rows, scores = index.snapshot().search(basis(0)[0], k)
+    assert len(rows) == 0 and len(scores) == 0
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.services.llm_client import LLMClient
+from app.services.usage_meter import usage_meter
+
+
+def chunk(content=None, usage=None):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], usage=usage)
+
+
+class FakeStream:
+    def __init__(self, chunks, stall=0.0):
+        self.chunks = list(chunks)
+        self.stall = stall
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.chunks:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.stall)
+        return self.chunks.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def client_for(stream):
+    async def create(**kwargs):
+        return stream
+
+    completions = SimpleNamespace(create=create)
+    registry = SimpleNamespace(async_openai_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return LLMClient(registry)
+
+
+@pytest.fixture(autouse=True)
+def quiet_meter(monkeypatch):
+    monkeypatch.setattr(usage_meter, "record", lambda *args, **kwargs: None)
+
+
+def test_slot_is_released_when_openai_finishes_not_the_caller():
+    stream = FakeStream([chunk("Hello. "), chunk("How are you?"), chunk(usage=SimpleNamespace())])
+    llm = client_for(stream)
+
+    async def run():
+        deltas = llm.stream_chat_completion(model="gpt-4o-mini", messages=[])
+        first = await deltas.__anext__()
+        await asyncio.sleep(0.01)  # The caller is busy speaking the first sentence
+        assert llm.in_flight == 0 and stream.closed
+        rest = [delta async for delta in deltas]
+        return [first] + rest
+
+    assert asyncio.run(run()) == ["Hello. ", "How are you?"]
+
+
+def test_stalled_stream_times_out_between_chunks():
+    stream = FakeStream([chunk("Hello. "), chunk("never")], stall=0.2)
+    llm = client_for(stream)
+
+    async def run():
+        return [delta async for delta in llm.stream_chat_completion(timeout=0.05, model="gpt-4o-mini", messages=[])]
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    assert llm.in_flight == 0 and stream.closed
+
+
+def test_closing_early_stops_reading_the_stream():
+    stream = FakeStream([chunk("Hello. ")] + [chunk("more") for _ in range(5)], stall=0.05)
+    llm = client_for(stream)
+
+    async def run():
+        deltas = llm.stream_chat_completion(model="gpt-4o-mini", messages=[])
+        assert await deltas.__anext__() == "Hello. "
+        await deltas.aclose()  # Barge-in
+
+    asyncio.run(run())
+    assert llm.in_flight == 0 and stream.closed and stream.chunks
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import pytest
+from app.config import settings
+from app.services import media_stream
+from app.services.media_stream import MediaStreamSpeaker
+
+SEGMENTS = ["One.", "Two.", "Three.", "Four."]
+
+
+@pytest.fixture
+def speaker(monkeypatch):
+    """Speaker with instant renders; ``speaker.sent`` collects the events it sends."""
+    monkeypatch.setattr(settings, "TTS_ENABLED", True)
+    sent = []
+
+    async def send_text(text):
+        sent.append(json.loads(text))
+
+    async def render(text):
+        return b"\xff" * 800  # 100 ms of silence
+
+    speaker = MediaStreamSpeaker(send_text)
+    speaker.stream_sid = "MZ-test"
+    speaker.sent = sent
+    monkeypatch.setattr(speaker, "_render", render)
+    return speaker
+
+
+async def words(segments):
+    for segment in segments:
+        yield segment
+
+
+def marks_sent(speaker):
+    return [event["mark"]["name"] for event in speaker.sent if event["event"] == "mark"]
+
+
+def test_sends_wait_for_twilio_to_play_earlier_segments(speaker):
+    async def run():
+        speaking = asyncio.create_task(speaker.speak_stream(words(SEGMENTS), lookahead=2))
+        await asyncio.sleep(0.05)
+        # One segment playing and one queued behind it; the rest wait for marks
+        assert marks_sent(speaker) == ["segment-1", "segment-2"]
+        speaker.on_mark("segment-1")
+        await asyncio.sleep(0.05)
+        assert marks_sent(speaker) == ["segment-1", "segment-2", "segment-3"]
+        speaker.on_mark("segment-2")
+        speaker.on_mark("segment-3")
+        await asyncio.wait_for(speaking, 1)
+        assert marks_sent(speaker)[-1] == "segment-4"
+
+    asyncio.run(run())
+
+
+def test_clear_releases_paced_sends(speaker):
+    async def run():
+        speaking = asyncio.create_task(speaker.speak_stream(words(SEGMENTS[:3]), lookahead=2))
+        await asyncio.sleep(0.05)
+        await speaker.clear()
+        await asyncio.wait_for(speaking, 1)
+        assert len(marks_sent(speaker)) == 3
+
+    asyncio.run(run())
+
+
+def test_lost_marks_fall_back_to_audio_duration(speaker, monkeypatch):
+    monkeypatch.setattr(media_stream, "MARK_GRACE_SECONDS", 0.05)
+
+    async def run():
+        await asyncio.wait_for(speaker.speak_stream(words(SEGMENTS[:3]), lookahead=2), 2)
+        assert len(marks_sent(speaker)) == 3
+
+    asyncio.run(run())
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_worker_module_imports_nothing_else_from_the_app():
+    # Spawned ingestion workers unpickle extract_page_window by importing its module
+    code = "import sys, app.services.pdf_pages; print(' '.join(sorted(m for m in sys.modules if m.split('.')[0] in ('app', 'fastapi'))))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["app", "app.services", "app.services.pdf_pages"]
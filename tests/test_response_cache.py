@@ -0,0 +1,10 @@
+from app.services.response_cache import factual_answer
+
+
+def test_follow_up_question_is_not_cached():
+    answer = "We automate outbound calls and book meetings. Plans start at $99 a month. What's your company called?"
+    assert factual_answer(answer) == "We automate outbound calls and book meetings. Plans start at $99 a month."
+
+
+def test_answer_that_is_only_a_question_is_not_cached():
+    assert factual_answer("Could you tell me a bit about your team first?") == ""
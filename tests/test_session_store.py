@@ -0,0 +1,65 @@
+import time
+import pytest
+from app.services.session_store import InMemorySessionStore, SessionStore, SqliteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Builds a store of the parametrized backend that records the sessions its end hooks saw."""
+    def make(ttl_seconds=60.0, max_size=10):
+        if request.param == "sqlite":
+            store = SqliteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds, max_size)
+        else:
+            store = InMemorySessionStore(ttl_seconds, max_size)
+        store.ended = []
+        store.add_end_hook(lambda key, value: store.ended.append((key, value)))
+        return store
+    return make
+
+
+def test_least_recently_used_session_is_evicted_at_max_size(make_store):
+    store = make_store(max_size=2)
+    store["CA1"] = {"turn": 1}
+    store["CA2"] = {"turn": 2}
+    time.sleep(0.01)
+    assert store.get("CA1") == {"turn": 1}  # CA2 is now the least recently used
+    store["CA3"] = {"turn": 3}
+    assert len(store) == 2
+    assert "CA2" not in store and "CA1" in store and "CA3" in store
+    assert store.ended == [("CA2", {"turn": 2})]
+
+
+def test_idle_session_expires_after_ttl(make_store):
+    store = make_store(ttl_seconds=0.05)
+    store["CA1"] = {"turn": 1}
+    assert store.get("CA1") == {"turn": 1}
+    time.sleep(0.1)
+    assert store.get("CA1") is None
+    store.evict_expired()  # The in-memory store has already evicted it on get
+    assert store.ended == [("CA1", {"turn": 1})]
+    assert len(store) == 0
+
+
+def test_end_removes_the_session_and_runs_hooks(make_store):
+    store = make_store()
+    store["CA1"] = {"turn": 1}
+    assert store.end("CA1") == {"turn": 1}
+    assert "CA1" not in store
+    assert store.ended == [("CA1", {"turn": 1})]
+
+
+def test_failing_hook_does_not_stop_the_others(make_store):
+    store = make_store()
+    store.end_hooks.insert(0, lambda key, value: 1 / 0)
+    store["CA1"] = {"turn": 1}
+    store.end("CA1")
+    assert store.ended == [("CA1", {"turn": 1})]
+
+
+def test_backend_missing_a_method_cannot_be_built():
+    class Partial(SessionStore):
+        def get(self, key, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        Partial(60.0, 10)
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.routes import twilio_routes
+from app.services.ai_agent import AI_SalesAgent
+from app.services.tts import tts_cache
+
+SEGMENTS = ["First sentence here.", "Second one.", "Third one?"]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(twilio_routes.router)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def streamed_reply(monkeypatch):
+    async def stream_response(self, text, was_interrupted=False):
+        for segment in SEGMENTS:
+            yield segment
+
+    monkeypatch.setattr(AI_SalesAgent, "stream_response", stream_response)
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    monkeypatch.setattr(settings, "TTS_ENABLED", True)
+
+
+@pytest.fixture
+def tts(monkeypatch):
+    """In-memory TTS cache whose renders take a while; returns the set of rendered phrases."""
+    rendered = set()
+
+    async def render(text):
+        await asyncio.sleep(0.2)
+        rendered.add(text)
+
+    monkeypatch.setattr(tts_cache, "cached_url", lambda text: f"https://example.test/{hash(text)}.wav" if text in rendered else None)
+    monkeypatch.setattr(tts_cache, "prefetch", lambda text: asyncio.ensure_future(render(text)))
+    return rendered
+
+
+def test_first_sentence_is_not_held_back_for_synthesis(client, streamed_reply, tts):
+    first = client.post("/process_speech", data={"CallSid": "CA-say", "SpeechResult": "tell me more"}).text
+    rest = client.post("/process_speech/continue", data={"CallSid": "CA-say"}).text
+    assert "<Say" in first and "<Play>" not in first
+    assert 'bargeIn="true"' in first
+    assert rest.count("<Say") == 2 and "<Play>" not in rest
+    assert not tts  # Nothing was synthesized for a <Say> reply
+
+
+def test_cached_first_sentence_keeps_the_whole_reply_in_one_voice(client, streamed_reply, tts):
+    tts.add(SEGMENTS[0])
+    first = client.post("/process_speech", data={"CallSid": "CA-play", "SpeechResult": "tell me more"}).text
+    rest = client.post("/process_speech/continue", data={"CallSid": "CA-play"}).text
+    assert first.count("<Play>") == 1 and "<Say" not in first
+    assert rest.count("<Play>") == 2 and "<Say" not in rest
+
+
+def test_cancelled_reply_falls_back_to_error_twiml(client, streamed_reply, monkeypatch):
+    async def stream_response(self, text, was_interrupted=False):
+        yield SEGMENTS[0]
+        await asyncio.sleep(10)
+        yield SEGMENTS[1]
+
+    monkeypatch.setattr(AI_SalesAgent, "stream_response", stream_response)
+    client.post("/process_speech", data={"CallSid": "CA-gone", "SpeechResult": "tell me more"})
+
+    async def cancel():
+        twilio_routes.pending_responses["CA-gone"][1].cancel()
+
+    client.portal.call(cancel)
+    response = client.post("/process_speech/continue", data={"CallSid": "CA-gone"})
+    assert response.status_code == 200
+    assert "<Redirect>/twilio/voice</Redirect>" in response.text
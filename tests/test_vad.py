@@ -0,0 +1,90 @@
+import numpy as np
+from app.services.vad import UtteranceSegmenter
+
+RATE = 16000
+FRAME = 320  # 20 ms
+
+
+def tone(ms: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(RATE * ms / 1000)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 300 * t)).astype(np.float32)
+
+
+def silence(ms: float) -> np.ndarray:
+    return np.zeros(int(RATE * ms / 1000), dtype=np.float32)
+
+
+def segment(segmenter: UtteranceSegmenter, *parts: np.ndarray) -> list[tuple[str, int, int]]:
+    audio = np.concatenate(parts)
+    events = []
+    for end in range(FRAME, len(audio) + 1, FRAME):
+        events += segmenter.feed(audio[end - FRAME:end], end)
+    return events
+
+
+def segmenter(**overrides) -> UtteranceSegmenter:
+    options = dict(
+        sample_rate=RATE, min_silence_ms=400, max_silence_ms=900, max_utterance_ms=15000,
+        partial_interval_ms=0, barge_in_ms=250
+    )
+    return UtteranceSegmenter(**{**options, **overrides})
+
+
+def test_speech_starts_after_onset_with_preroll():
+    events = segment(segmenter(), silence(500), tone(100))
+    assert [kind for kind, _, _ in events] == ["speech_start"]
+    _, start, end = events[0]
+    # Speech began at 500 ms; the start keeps 200 ms of pre-roll and fires after the 60 ms onset
+    assert start == int(0.3 * RATE)
+    assert end == int(0.56 * RATE)
+
+
+def hangover_ms(speech_ms: float) -> float:
+    """Silence after speech before the segmenter closes the utterance."""
+    seg = segmenter()
+    segment(seg, silence(500), tone(speech_ms))
+    position = int(RATE * (500 + speech_ms) / 1000)
+    for frames in range(1, 100):
+        position += FRAME
+        if any(kind == "utterance" for kind, _, _ in seg.feed(np.zeros(FRAME, dtype=np.float32), position)):
+            return frames * 1000 * FRAME / RATE
+    raise AssertionError("utterance never ended")
+
+
+def test_short_utterance_waits_longer_for_a_continuation():
+    short, long = hangover_ms(300), hangover_ms(4000)
+    assert 400 <= long < short <= 900
+    assert long == 400  # Past 3 s of utterance the hangover is the minimum
+
+
+def test_long_utterance_ends_after_a_shorter_silence():
+    events = segment(segmenter(), silence(500), tone(3000), silence(500))
+    kinds = [kind for kind, _, _ in events]
+    assert kinds == ["speech_start", "barge_in", "utterance"]
+    _, start, end = events[-1]
+    # Trailing silence is dropped from the utterance
+    assert start == int(0.3 * RATE) and end == int(3.5 * RATE)
+
+
+def test_pause_inside_speech_does_not_split_the_utterance():
+    events = segment(segmenter(), silence(500), tone(1000), silence(300), tone(1000), silence(1000))
+    assert [kind for kind, _, _ in events].count("utterance") == 1
+
+
+def test_blip_shorter_than_onset_is_not_speech():
+    assert segment(segmenter(), silence(500), tone(40), silence(1000)) == []
+
+
+def test_cough_starts_speech_but_never_barges_in():
+    kinds = [kind for kind, _, _ in segment(segmenter(), silence(500), tone(100), silence(1000))]
+    assert kinds == ["speech_start", "utterance"]
+
+
+def test_utterance_is_cut_at_the_maximum_length():
+    events = segment(segmenter(max_utterance_ms=2000), silence(500), tone(5000))
+    assert [kind for kind, _, _ in events].count("utterance") == 2
+
+
+def test_partials_at_the_configured_interval():
+    events = segment(segmenter(partial_interval_ms=500), silence(500), tone(1600))
+    assert [kind for kind, _, _ in events].count("partial") == 3
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from app.services.vector_index import IVFVectorIndex, VectorIndex, build_vector_index, top_k
+
+
+def clustered(rng, count, dim=32, centers=64):
+    """Embeddings grouped around topics, the way chunk embeddings of a document set are."""
+    topics = rng.standard_normal((centers, dim)).astype(np.float32)
+    return topics[rng.integers(centers, size=count)] + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+
+
+def test_exact_search_ranks_by_cosine_similarity():
+    index = VectorIndex([[1, 0], [0, 1], [1, 1]])
+    rows, scores = index.search([2, 0.1], k=2)
+    assert list(rows) == [0, 2]
+    assert scores[0] == pytest.approx(0.9988, abs=1e-3)
+
+
+def test_ivf_recall_matches_exact_search():
+    rng = np.random.default_rng(7)
+    vectors = clustered(rng, 4000)
+    queries = vectors[rng.choice(len(vectors), 50, replace=False)] + 0.1 * rng.standard_normal((50, 32)).astype(np.float32)
+    exact, approximate = VectorIndex(vectors), IVFVectorIndex(vectors, n_probe=8)
+    k = 10
+    hits = sum(
+        len(set(exact.search(query, k)[0]) & set(approximate.search(query, k)[0]))
+        for query in queries
+    )
+    assert hits / (k * len(queries)) >= 0.9
+
+
+def test_ivf_returns_original_row_ids_and_scores():
+    rng = np.random.default_rng(1)
+    vectors = clustered(rng, 500)
+    index = IVFVectorIndex(vectors)
+    rows, scores = index.search(vectors[123], k=1)
+    assert rows[0] == 123 and scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert np.allclose(index.row_vectors(), VectorIndex(vectors).row_vectors())
+
+
+@pytest.mark.parametrize("make", [VectorIndex, lambda vectors: IVFVectorIndex(vectors, n_lists=4, n_probe=1)])
+def test_k_larger_than_the_index_returns_every_row(make):
+    vectors = np.random.default_rng(2).standard_normal((6, 8))
+    rows, scores = make(vectors).search(vectors[0], k=20)
+    assert sorted(rows) == list(range(6))
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("make", [VectorIndex, lambda vectors: IVFVectorIndex(vectors, n_lists=4, n_probe=1)])
+def test_mask_skips_rows(make):
+    vectors = np.random.default_rng(3).standard_normal((40, 8))
+    mask = np.ones(40, dtype=bool)
+    mask[0] = False
+    rows, _ = make(vectors).search(vectors[0], k=5, mask=mask)
+    assert 0 not in rows and len(rows) == 5
+
+
+def test_empty_index_returns_nothing():
+    for index in (VectorIndex([]), build_vector_index([])):
+        assert len(index) == 0
+        rows, scores = index.search(np.ones(8), k=3)
+        assert len(rows) == 0 and len(scores) == 0
+
+
+def test_top_k_handles_small_and_empty_inputs():
+    assert list(top_k(np.array([0.1, 0.9, 0.5]), 2)) == [1, 2]
+    assert list(top_k(np.array([0.1, 0.9]), 5)) == [1, 0]
+    assert len(top_k(np.zeros(0), 3)) == 0
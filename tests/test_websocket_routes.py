@@ -0,0 +1,68 @@
+import base64
+import numpy as np
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.ai_agent import AI_SalesAgent
+from app.services.asr_pool import asr_pool
+from app.services.audio_frontend import MULAW_ENCODE_TABLE
+
+SILENCE = base64.b64encode(b"\xff" * 160).decode()  # 20 ms of μ-law silence
+
+
+def media_frames(seconds: float, amplitude: float = 0.3) -> list[str]:
+    """Base64 μ-law frames of a 300 Hz tone (silence at amplitude 0), 20 ms each."""
+    t = np.arange(int(8000 * seconds)) / 8000
+    pcm = (amplitude * 32767 * np.sin(2 * np.pi * 300 * t)).astype(np.int16)
+    codes = MULAW_ENCODE_TABLE[pcm.view(np.uint16)]
+    return [base64.b64encode(codes[i:i + 160].tobytes()).decode() for i in range(0, len(codes), 160)]
+
+
+def test_stream_route_is_served():
+    assert "/twilio/stream" in {route.path for route in app.routes}
+
+
+def test_stream_greets_and_hangs_up_on_stop():
+    client = TestClient(app)
+    with client.websocket_connect("/twilio/stream") as ws:
+        ws.send_json({"event": "start", "start": {"streamSid": "MZ1", "customParameters": {"call_sid": "CA-stream"}}})
+        greeting = ws.receive_json()
+        assert greeting["event"] == "media" and "Vaani" in greeting["text"]
+        for _ in range(10):
+            ws.send_json({"event": "media", "streamSid": "MZ1", "media": {"payload": SILENCE}})
+        ws.send_json({"event": "stop", "streamSid": "MZ1"})
+        with pytest.raises(WebSocketDisconnect):
+            ws.receive_json()
+
+
+def test_utterance_is_transcribed_in_the_asr_pool_and_answered(monkeypatch):
+    heard = []
+
+    async def transcribe(samples):
+        heard.append(samples)
+        return "what do you do"
+
+    async def stream_response(self, text, was_interrupted=False):
+        yield f"You said: {text}."
+
+    monkeypatch.setattr(asr_pool, "transcribe", transcribe)
+    monkeypatch.setattr(AI_SalesAgent, "stream_response", stream_response)
+
+    client = TestClient(app)
+    with client.websocket_connect("/twilio/stream") as ws:
+        ws.send_json({"event": "start", "start": {"streamSid": "MZ2", "customParameters": {"call_sid": "CA-asr"}}})
+        ws.receive_json()  # Greeting
+        for payload in media_frames(0.5, 0) + media_frames(1.0) + media_frames(1.5, 0):
+            ws.send_json({"event": "media", "streamSid": "MZ2", "media": {"payload": payload}})
+        partials = []
+        reply = ws.receive_json()
+        while reply["event"] == "partial":  # Text clients also get in-progress hypotheses
+            partials.append(reply)
+            reply = ws.receive_json()
+        ws.send_json({"event": "stop", "streamSid": "MZ2"})
+
+    assert reply == {"event": "media", "text": "You said: what do you do."}
+    assert len(heard) >= len(partials) + 1
+    # The utterance is 16 kHz float audio: the second of tone plus a little pre-roll, no trailing silence
+    assert heard[-1].dtype == np.float32 and 16000 <= len(heard[-1]) <= 16000 * 1.3